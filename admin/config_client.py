@@ -6,6 +6,7 @@ import sys
 import os.path
 import getopt
 import xmlrpclib
+import time
 
 class SafeTransportWithCert(xmlrpclib.SafeTransport): 
     # TODO add generation of admin certificates in deploy and document it
@@ -60,6 +61,22 @@ def set_key(server, key, old_value, new_value):
         server.ChangeConfig(key, new_value)
         print "Changed."
 
+def profile(server, seconds, output_path):
+    print "Profiling the server for %s seconds..." % (seconds,)
+    profile_id = server.Profile(seconds)
+    time.sleep(seconds)
+    result = server.ProfileResult(profile_id)
+    while not result['done']:
+        time.sleep(0.5)
+        result = server.ProfileResult(profile_id)
+    with open(output_path, 'w') as f:
+        f.write(result['collapsed'])
+    print "Took %i samples, wrote the stacks to %s (render with: flamegraph.pl %s > profile.svg)" % (result['samples'], output_path, output_path)
+    print
+    print "Most sampled frames:"
+    for frame, samples in result['top']:
+        print "%6i  %s" % (samples, frame)
+
 DEFAULT_HOST_AND_PORT='127.0.0.1:8001'
 
 if __name__ == '__main__':
@@ -67,6 +84,8 @@ if __name__ == '__main__':
     parser = optparse.OptionParser(usage = "usage: %prog [options] AM_HOST:PORT")
     parser.add_option("--list", action="store_true", help="Lists all available config items.")
     parser.add_option("--set", help="Sets the config item for the given key with the given value (KEY=VALUE).")
+    parser.add_option("--profile", type="float", metavar="SECONDS", help="Samples the stacks of the running server for the given number of seconds (needs the admin certificate).")
+    parser.add_option("--profile-output", help="File to write the profiled stacks to in flamegraph's collapsed format. (defaults to 'profile.txt')", default="profile.txt")
     parser.add_option("--interactive", action="store_true", help="Starts this client in an interactive shell mode.")
     parser.add_option("--cert", help="Specifies the certificate which is used to connect. (in PEM format, defaults to 'admin-cert.pem')", default="admin-cert.pem")
     parser.add_option("--key", help="Specifies the private key used to sign the messages sent. (in PEM format, defaults to 'admin-key.pem')", default="admin-key.pem")
@@ -83,7 +102,7 @@ if __name__ == '__main__':
     transport = SafeTransportWithCert()
     server = xmlrpclib.ServerProxy("https://%s/amconfig" % (host_name,), transport=transport)
     
-    if not (opts.list or opts.interactive or opts.set):
+    if not (opts.list or opts.interactive or opts.set or opts.profile):
         parser.print_help()
     
     if opts.cert:
@@ -95,6 +114,9 @@ if __name__ == '__main__':
         keys = server.ListConfigKeys() # reload the keys every time
         print_configs(keys, False)
     
+    if opts.profile:
+        profile(server, opts.profile, opts.profile_output)
+
     if opts.set:
         if opts.set.find('=') == -1:
             raise ValueError("When using the --set option, please use KEY=VALUE format after.")
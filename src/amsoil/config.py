@@ -4,6 +4,7 @@ All (non core) implementations/plugins should use the config service/plugin.
 """
 
 import logging
+import os
 import os.path
 import json
 
@@ -19,6 +20,10 @@ PLUGINS_PATH = os.path.join(SRC_PATH, 'plugins')
 LOG_LEVEL = logging.DEBUG
 LOG_FORMAT = "%(asctime)s [%(levelname)s] - %(message)s"
 LOG_FILE = "%s/log/amsoil.log" % (ROOT_PATH,)
+LOG_QUEUED = True # the handlers run on a background thread, so logging does not block the calling thread (see amsoil.core.log)
+LOG_QUEUE_SIZE = 10000 # number of records which may wait for being written (further records are dropped and counted)
+LOG_JSON = False # write JSON lines (with the request id) instead of LOG_FORMAT
+LOG_MAX_MESSAGE_LENGTH = 16384 # longer messages are truncated (0 disables the truncation)
 
 ##CONFIGDB
 CONFIGDB_PATH = "%s/deploy/config.db" % (ROOT_PATH,)
@@ -55,4 +60,4 @@ except Exception:
 default_ip, default_port, default_name= 'localhost', '27017', 'ohouse'
 db_ip = MONGO_CONFIG['DATABASE']['server'] or default_ip
 db_port = int(MONGO_CONFIG['DATABASE']['port']) or default_port
-db_name = MONGO_CONFIG['DATABASE']['name'] or default_name
\ No newline at end of file
+db_name = os.environ.get('OHOUSE_DB_NAME') or MONGO_CONFIG['DATABASE']['name'] or default_name # the environment variable allows to run on a scratch database (e.g. test/benchmark)
\ No newline at end of file
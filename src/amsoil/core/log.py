@@ -1,6 +1,6 @@
 """
 This module provides logging facilities. More specifically, it provides a way to get to a (configured) python logger.
-Hence the interface of this logger is the same as the python one (so please direct all complaints regarding this to the python people). 
+Hence the interface of this logger is the same as the python one (so please direct all complaints regarding this to the python people).
 In order to get such a logger instance, you could insert this code at the beginning of your module:
     import amsoil.core.log
     logger=amsoil.core.log.getLogger('SOMENAME')
@@ -8,6 +8,10 @@ whereby SOMENAME represents an optional prefix for the logging messages (e.g. 'x
 
 Configuration
 Please see the config.py file in the root/src-folder.
+If LOG_QUEUED is set, the records are put into a queue and written by a background thread (see QueueHandler and QueueListener).
+So the calling thread only formats the message. Messages longer than LOG_MAX_MESSAGE_LENGTH are truncated (see truncate).
+If LOG_JSON is set, each record is written as JSON object on one line (see JSONFormatter). The records carry the id of the
+request being handled in the thread (see set_request_id).
 
 Rationale
 After long discussions logging is a core service.
@@ -17,6 +21,11 @@ edit the log config (level, file, etc.). If you had a plugin for it, the config-
 when the pluginmanager loads.
 """
 import logging, logging.handlers
+import atexit
+import json
+import os
+import threading
+import Queue
 
 from amsoil import config
 
@@ -38,13 +47,159 @@ class PrefixAdapter(logging.LoggerAdapter):
 
     def process(self, msg, kwargs):
         prefix = self.extra["prefix"]
+        extra = dict(kwargs.get("extra") or {})
+        extra.setdefault("prefix", prefix)
+        kwargs["extra"] = extra
         return ("[%s] %s" % (prefix, msg), kwargs)
-        
+
+# request ids
+_request = threading.local()
+
+def set_request_id(request_id):
+    """Sets the id of the request handled by the current thread (None clears it). The id is added to the records logged in this thread."""
+    _request.id = request_id
+
+def get_request_id():
+    return getattr(_request, 'id', None)
+
+def truncate(text, limit):
+    """Returns the {text} shortened to {limit} characters (plus a note on how much was cut). A {limit} of 0 or None disables the truncation."""
+    if not limit or (text is None) or (len(text) <= limit):
+        return text
+    return "%s... [truncated %i of %i characters]" % (text[:limit], len(text) - limit, len(text))
+
+class RecordPreparingFilter(logging.Filter):
+    """
+    Fills in the request id and merges the arguments into the message (truncated to {max_length}).
+    The exception info is rendered to text, so the record can be handled later in another thread.
+    """
+    def __init__(self, max_length):
+        logging.Filter.__init__(self)
+        self._max_length = max_length
+        self._formatter = logging.Formatter()
+
+    def filter(self, record):
+        record.request_id = get_request_id()
+        try:
+            message = record.getMessage()
+        except Exception: # e.g. the arguments do not match the format string, this must not raise into the logging code
+            message = "%r (arguments: %r)" % (record.msg, record.args)
+        record.msg = truncate(message, self._max_length)
+        record.args = None
+        if record.exc_info:
+            try:
+                record.exc_text = self._formatter.formatException(record.exc_info)
+            except Exception:
+                record.exc_text = repr(record.exc_info[1])
+            record.exc_info = None
+        return True
+
+class QueueHandler(logging.Handler):
+    """
+    Puts the records into the {queue} (without blocking). Records which do not fit into the queue are dropped and counted.
+    The listener thread does not exist in a forked child process (e.g. of the worker's process pool), so in there the records
+    are passed to the {fallback_handlers} directly.
+    """
+    def __init__(self, queue, fallback_handlers=()):
+        logging.Handler.__init__(self)
+        self.queue = queue
+        self.dropped = 0
+        self._pid = os.getpid()
+        self._fallback_handlers = fallback_handlers
+        self._fallback_pid = None
+
+    def createLock(self):
+        self.lock = None # the queue is thread-safe (and a lock could be held by another thread when the process forks)
+
+    def emit(self, record):
+        if os.getpid() != self._pid:
+            self._emit_forked(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except Queue.Full:
+            self.dropped += 1 # not exact, because not locked, but good enough for the report in QueueListener
+
+    def _emit_forked(self, record):
+        pid = os.getpid()
+        if self._fallback_pid != pid: # the parent's listener thread may have held the handlers' locks when forking
+            for handler in self._fallback_handlers:
+                handler.createLock()
+            self._fallback_pid = pid
+        for handler in self._fallback_handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+class QueueListener(object):
+    """Takes the records from the {queue} in a background thread and passes them to the {handlers}."""
+    _STOP = object()
+
+    def __init__(self, queue, handlers, queue_handler=None):
+        self.queue = queue
+        self.handlers = handlers
+        self._queue_handler = queue_handler
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='log-listener')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Writes the records which are still queued and ends the thread."""
+        if self._thread:
+            self.queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        reported = 0
+        while True:
+            record = self.queue.get()
+            if record is self._STOP:
+                break
+            self._handle(record)
+            if self._queue_handler and (self._queue_handler.dropped > reported):
+                dropped, reported = self._queue_handler.dropped - reported, self._queue_handler.dropped
+                self._handle(logging.LogRecord(LOGGER_NAME, logging.WARNING, __file__, 0, "[log] Dropped %i log records, because the queue was full (see LOG_QUEUE_SIZE)" % (dropped,), None, None))
+
+    def _handle(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+class JSONFormatter(logging.Formatter):
+    """Formats a record as JSON object on one line (time, level, prefix, request_id, thread, message and exception)."""
+    def format(self, record):
+        prefix, message = getattr(record, 'prefix', None), record.getMessage()
+        if prefix and message.startswith("[%s] " % (prefix,)): # added by the PrefixAdapter
+            message = message[len(prefix) + 3:]
+        entry = {
+            'time' : self.formatTime(record),
+            'level' : record.levelname,
+            'prefix' : prefix,
+            'request_id' : getattr(record, 'request_id', None),
+            'thread' : record.threadName,
+            'message' : message}
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry)
+
 # initialziation
 lhandle = logging.handlers.RotatingFileHandler(config.LOG_FILE, maxBytes = 1000000)
 lhandle.setLevel(config.LOG_LEVEL)
-lhandle.setFormatter(logging.Formatter(config.LOG_FORMAT))
+lhandle.setFormatter(JSONFormatter() if config.LOG_JSON else logging.Formatter(config.LOG_FORMAT))
 logger = getLogger()
-logger.addHandler(lhandle)
+logger.addFilter(RecordPreparingFilter(config.LOG_MAX_MESSAGE_LENGTH))
+if config.LOG_QUEUED:
+    qhandle = QueueHandler(Queue.Queue(config.LOG_QUEUE_SIZE), [lhandle])
+    listener = QueueListener(qhandle.queue, [lhandle], qhandle)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(qhandle)
+else:
+    logger.addHandler(lhandle)
 logger.setLevel(config.LOG_LEVEL)
 logger.info("Logging initialized")
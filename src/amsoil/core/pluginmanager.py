@@ -15,6 +15,22 @@ Each plugin need a manifest (see below) and a module called plugin at root level
 Plugin Setup
 After resolving the dependencies (determined by the manifest) of the plugin, the setup() method of the plugin module is called.
 This would be a good place to register the plugin's services.
+The time each plugin took to import and set up is logged after loading all plugins (see setup_report).
+
+Lazy services and partial setup
+A plugin may register a factory instead of the service (registerService(name, factory, lazy=True)), e.g. if the construction
+connects to a database. The factory is called on the first getService(name) and its result is returned from then on.
+A process which only needs some services can pass them to init(pluginsPath, services=[...]). Then only the plugins implementing
+these services (and the plugins they load after) are set up. The other plugins are set up when one of their services is asked for
+the first time (see getService).
+
+Service handles
+Code which uses a service in a hot path can keep a handle instead of calling getService on every call: serviceHandle(name)
+returns a ServiceHandle which resolves the service on first use and keeps it until the registry changes (a service is registered
+or a lazy service is instantiated). So handles can be created before the service is registered (e.g. at module level or in a
+constructor) and stay valid afterwards. Calling the handle returns the service, other attributes are forwarded to the service:
+    config = pm.serviceHandle('config')
+    config.get('flask.hostname') # same as config().get('flask.hostname')
 
 Manifests
 Each plugin in the plugins directory requires a file named "MANIFEST.json".
@@ -40,9 +56,13 @@ import traceback
 import os, os.path
 import json
 import imp
+import time
+import heapq
+import threading
 
 from amsoil import config
 from amsoil.core.exception import CoreException
+from amsoil.core import trace
 
 import amsoil.core.log
 logger=amsoil.core.log.getLogger('pluginmanager')
@@ -88,7 +108,12 @@ class ServiceNameNotFoundInManifestError(PluginException):
     pass
 
 _plugin_list = []
+_load_order = [] # the plugins which have been set up, in the order of their setup
+_providers = {} # maps service names to the PluginInfo implementing it (set by init)
 _service_registry = {}
+_registry_generation = [0] # increased whenever the _service_registry changes, so ServiceHandles resolve their service again
+_handles = {} # maps service names to the ServiceHandle shared by all callers of serviceHandle
+_setup_lock = threading.RLock() # held while setting up plugins or instantiating lazy services after init (reentrant, because setups/factories ask for other services)
 _current_setup_plugin_info = None # in order to avoid passing pluginInfos to the setup methods of plugins, we remember
 # a reference to the current pluginInfo during the plugin setup. If there is not setup method being called this variable should be None.
 # This is a pure convenience for the plugin-developer, so he does not have to pass the pluginInfo back to registerService
@@ -127,10 +152,13 @@ class PluginInfo(object):
             raise PluginMalformedManifestError(path)
 
         self._plugin_module = None
+        self.import_duration = None # seconds it took to import the plugin module (set by setup)
+        self.setup_duration = None # seconds the plugin's setup() method took (set by setup)
 
     def setup(self):
         """Load the plugin, set the _pluginModule and call the setup method."""
         logger.info("loading %s" % self.pluginName)
+        start = time.time()
         try:
             bFile, bFilename, bDesc = imp.find_module(BOOTSTRAP_MODULE_NAME, [self._plugin_path])
             sys.path.append(os.path.dirname(bFilename))
@@ -138,48 +166,28 @@ class PluginInfo(object):
         except ImportError, e:
             logger.exception(traceback.format_exc())
             raise PluginBootstrapModuleNotLoaded(self.pluginName)
+        self.import_duration = time.time() - start
         global _current_setup_plugin_info # see documentation above
         if not hasattr(self._plugin_module, 'setup'):
             self._plugin_module = None
             raise PluginBootstrapSetupMethodNotFoundError(self.pluginName)
         _current_setup_plugin_info = self
+        start = time.time()
         self._plugin_module.setup()
+        self.setup_duration = time.time() - start
         _current_setup_plugin_info = None
 
     def implementsService(self, name):
         """Tells if the plugin's manifest specifies the service's name given."""
         return (name in self._service_names)
 
-    def allLoadsAfterSatisfied(self, pluginList):
-        """
-        Checks if all plugins specified in _loadsAfter have been loaded.
-        """
-        for depServiceName in self._loadsAfter:
-            # find out if all dependent service names have already been loaded, if not return False
-            foundService = False
-            for otherPluginInfo in pluginList:
-                if otherPluginInfo.implementsService(depServiceName):
-                    foundService=True
-                    if not otherPluginInfo.loaded: # here I assume that service names are unique
-                        return False
-                    break
-            if not foundService:
-                return False
-        return True
-
-    def allRequiresSatisfied(self, pluginList):
-        """
-        Checks if all plugins specified in _requires are available.
-        """
-        for depServiceName in self._requires: # this is a little redundant to above
-            foundService=False
-            for otherPluginInfo in pluginList:
-                if otherPluginInfo.implementsService(depServiceName):
-                    foundService=True
-                    break
-            if not foundService:
-                return False
-        return True
+    @property
+    def loadsAfter(self):
+        return list(self._loadsAfter)
+
+    @property
+    def requires(self):
+        return list(self._requires)
 
     @property
     def loaded(self):
@@ -206,19 +214,20 @@ class PluginInfo(object):
         return self._plugin_manifest
 
 
-def init(pluginsPath):
+def init(pluginsPath, services=None):
     """
     Should be called during bootstrapping of the AM.
     Walks through the plugins directory and reads the dependencies (loadsAfter, requires) and saves this information to the pluginList.
     Then the plugins' setup method is called, where the plugin can register it's services.
     The order of loading depends on the loadsAfter tree.
+    If a list of {services} is given, only the plugins needed for these services are set up (see module description).
 
     Semantics:
     During the setup of the plugins the plugins can assume that the service which are specified in loadsAfter are present.
     The plugins which are specified in requries are not necessarily present during the setup call, but the system enforces
     that they are present in the system after all plugins are present.
     """
-    for path in os.listdir(pluginsPath):
+    for path in sorted(os.listdir(pluginsPath)): # sorted, so the load order does not depend on the file system
         absPath = os.path.join(pluginsPath, path)
         if not os.path.isdir(absPath):
             continue
@@ -233,64 +242,225 @@ def init(pluginsPath):
         _plugin_list.append(PluginInfo(absPath, manifest))
 
     # check for duplications of service implementations
-    allServices = []  # damn i can not find decent documentation on sets... the next couple of lines are ugly
-    for pluginInfo in _plugin_list:
-        allServices.extend(pluginInfo.serviceNames)
-    for s in set(allServices):
-        allServices.remove(s)
-    if len(allServices) > 0:
-        raise PluginDuplicateServiceDefinitionsInManifestError(', '.join(allServices))
+    providers = _service_providers(_plugin_list)
+    _providers.update(providers)
 
     if config.IS_MULTIPROCESS:
         for pluginInfo in _plugin_list:
             if not pluginInfo.supports_multiprocess:
                 raise PluginUnsupportedMultiprocess(pluginInfo.pluginName)
 
-    # Load the plugins in according to the loadsAfter specifications in the plugin's manifest.
-    # This is how it works:
-    #   iterate through the pluginList and load the plugins which have no (loadsAfter) dependencies
-    #   repeat this iteration as long as at least one plugin was loaded in the last cycle.
-    #   if there are unloaded plugins left after that, there is an unsatifyable dependency (either cycle or undefined service names).
-    loadedPlugin = True
-    while (loadedPlugin):
-        loadedPlugin = False
-        for pluginInfo in _plugin_list:
-            if pluginInfo.loaded:
-                continue
-            if pluginInfo.allLoadsAfterSatisfied(_plugin_list):
-               pluginInfo.setup()
-               loadedPlugin = True
-
-    # crash if not all plugins loaded
-    # also crash if not all requires statements are satisfied
+    # Load the plugins in according to the loadsAfter specifications in the plugin's manifest (see load_order).
+    # Crash if the loadsAfter can not be satisfied (either cycle or undefined service names) before any plugin is set up.
+    start = time.time()
+    ordered = load_order(_plugin_list, providers)
+    if services is not None:
+        needed = _loads_after_closure([_provider(name) for name in services])
+        ordered = [p for p in ordered if p in needed]
+    with _setup_lock:
+        for pluginInfo in ordered:
+            pluginInfo.setup()
+            _load_order.append(pluginInfo)
+
+    # crash if not all requires statements are satisfied
     for pluginInfo in _plugin_list:
-        if not pluginInfo.loaded:
-            raise PluginLoadAfterResolvingError(pluginInfo.pluginName)
-        if not pluginInfo.allRequiresSatisfied(_plugin_list):
-            raise PluginRequiresCanNotBeFulfilledError(pluginInfo.pluginName)
+        for name in pluginInfo.requires:
+            if name not in providers:
+                raise PluginRequiresCanNotBeFulfilledError("%s (no plugin implements %s)" % (pluginInfo.pluginName, name))
     logger.info("done loading plugins")
+    logger.info(setup_report(time.time() - start))
+
+def _provider(name):
+    if name not in _providers:
+        raise ServiceNotRegisteredError(name)
+    return _providers[name]
+
+def _loads_after_closure(pluginInfos):
+    """Returns the set of the given plugins and all plugins they (transitively) load after."""
+    result, todo = set(), list(pluginInfos)
+    while todo:
+        pluginInfo = todo.pop()
+        if pluginInfo in result:
+            continue
+        result.add(pluginInfo)
+        todo.extend(_providers[name] for name in pluginInfo.loadsAfter)
+    return result
+
+def _setup_on_demand(name):
+    """Sets up the plugin implementing the service {name} (and the plugins it loads after) if this has not happened in init."""
+    with _setup_lock:
+        if name in _service_registry: # set up by another thread meanwhile
+            return
+        needed = _loads_after_closure([_provider(name)])
+        for pluginInfo in load_order([p for p in _plugin_list if (p in needed) and not p.loaded], _providers):
+            logger.info("setting up %s on demand (for service %s)" % (pluginInfo.pluginName, name))
+            pluginInfo.setup()
+            _load_order.append(pluginInfo)
+
+def _service_providers(pluginList):
+    """Returns a dict which maps the service names to the plugin implementing the service. Raises PluginDuplicateServiceDefinitionsInManifestError."""
+    providers = {}
+    duplicates = set()
+    for pluginInfo in pluginList:
+        for name in pluginInfo.serviceNames:
+            if name in providers:
+                duplicates.add(name)
+            providers[name] = pluginInfo
+    if duplicates:
+        raise PluginDuplicateServiceDefinitionsInManifestError(', '.join(sorted(duplicates)))
+    return providers
+
+def load_order(pluginList, providers=None):
+    """
+    Returns the plugins in an order which satisfies the loadsAfter of each plugin (topological sort, Kahn's algorithm).
+    Plugins which do not depend on each other keep the order of the {pluginList}.
+    Raises PluginLoadAfterResolvingError naming the plugin and the missing service or the plugins on the dependency cycle.
+    """
+    if providers is None:
+        providers = _service_providers(pluginList)
+    index = dict((id(p), i) for i, p in enumerate(pluginList))
+    dependants = dict((id(p), []) for p in pluginList) # maps plugin to the plugins which load after it
+    waiting_for = {} # maps plugin to the number of plugins it has to wait for
+    for pluginInfo in pluginList:
+        dependencies = set()
+        for name in pluginInfo.loadsAfter:
+            if name not in providers:
+                raise PluginLoadAfterResolvingError("%s (no plugin implements %s)" % (pluginInfo.pluginName, name))
+            if id(providers[name]) in index: # plugins which are not in the list have been set up before
+                dependencies.add(id(providers[name]))
+        for dependency in dependencies:
+            dependants[dependency].append(pluginInfo)
+        waiting_for[id(pluginInfo)] = len(dependencies)
+
+    ready = [(index[id(p)], p) for p in pluginList if waiting_for[id(p)] == 0]
+    heapq.heapify(ready)
+    result = []
+    while ready:
+        i, pluginInfo = heapq.heappop(ready)
+        result.append(pluginInfo)
+        for dependant in dependants[id(pluginInfo)]:
+            waiting_for[id(dependant)] -= 1
+            if waiting_for[id(dependant)] == 0:
+                heapq.heappush(ready, (index[id(dependant)], dependant))
+    if len(result) < len(pluginList):
+        remaining = [p for p in pluginList if waiting_for[id(p)] > 0]
+        raise PluginLoadAfterResolvingError("loads-after cycle: %s" % (" -> ".join(p.pluginName for p in _find_cycle(remaining, providers)),))
+    return result
+
+def _find_cycle(remaining, providers):
+    """Returns the plugins on one cycle among the {remaining} plugins (first plugin repeated at the end), following the loadsAfter."""
+    remaining_ids = set(id(p) for p in remaining)
+    path, position = [], {}
+    pluginInfo = remaining[0]
+    while id(pluginInfo) not in position: # each remaining plugin waits for a remaining plugin, so walking along the dependencies must end in a cycle
+        position[id(pluginInfo)] = len(path)
+        path.append(pluginInfo)
+        pluginInfo = [providers[n] for n in pluginInfo.loadsAfter if id(providers[n]) in remaining_ids][0]
+    return path[position[id(pluginInfo)]:] + [pluginInfo]
+
+def setup_timings():
+    """Returns a list of (plugin name, import seconds, setup seconds) for the loaded plugins in the order they were loaded."""
+    return [(p.pluginName, p.import_duration, p.setup_duration) for p in _load_order]
+
+def setup_report(total=None):
+    """Returns a table of the plugins' import and setup durations, the slowest first."""
+    timings = sorted(setup_timings(), key=lambda (name, imp_s, setup_s): -(imp_s + setup_s))
+    lines = ["plugin setup times%s:" % (" (%.3fs in total)" % (total,) if total is not None else "",)]
+    for name, import_duration, setup_duration in timings:
+        lines.append("  %-28s %8.3fs (import %.3fs, setup %.3fs)" % (name, import_duration + setup_duration, import_duration, setup_duration))
+    return "\n".join(lines)
 
 def getService(name):
     """
     Receives the thing (object, module or whatever) which has been added by the registerService.
+    If the plugin implementing the service has not been set up yet (see init) or the service was registered as lazy, this happens now.
     """
-    if not name in _service_registry:
-        raise ServiceNotRegisteredError(name)
-    return _service_registry[name]
-
-def registerService(name, service):
+    service = _service_registry.get(name, _NOT_REGISTERED)
+    if service is _NOT_REGISTERED:
+        if name not in _providers:
+            raise ServiceNotRegisteredError(name)
+        with trace.span('pm.setup_on_demand'): # only the slow paths are traced, the lookup itself is on every request's path
+            _setup_on_demand(name)
+        service = _service_registry.get(name, _NOT_REGISTERED)
+        if service is _NOT_REGISTERED: # the plugin did not register the service in its setup
+            raise ServiceNotRegisteredError(name)
+    if isinstance(service, _LazyService):
+        with trace.span('pm.instantiate'):
+            service = _instantiate(name)
+    return service
+
+def registerService(name, service, lazy=False):
     """
     Register a service under the given name
     Service can be an object, a class or any other thing (even a module or a package)
+    If {lazy} is set, {service} is a callable without parameters which creates the service on the first getService (see module description).
     """
-    logger.info("registering service %s" % name)
+    logger.info("registering service %s%s" % (name, " (lazy)" if lazy else ""))
     if name in _service_registry: # check if the service has already been registered
         raise ServiceAlreadyRegisteredError(name)
 
     # to avoid developer's misspelling: check if the service's name is in the manifest file
     if (_current_setup_plugin_info) and (not _current_setup_plugin_info.implementsService(name)):
         raise ServiceNameNotFoundInManifestError(name)
-    _service_registry[name] = service
+    _service_registry[name] = _LazyService(service) if lazy else service
+    _registry_generation[0] += 1
+
+_NOT_REGISTERED = object()
+
+class _LazyService(object):
+    """Placeholder in the _service_registry for a service registered with lazy=True."""
+    __slots__ = ('factory',)
+
+    def __init__(self, factory):
+        self.factory = factory
+
+def _instantiate(name):
+    """Calls the factory of the lazy service {name} (once) and replaces the placeholder with the result."""
+    with _setup_lock:
+        service = _service_registry[name]
+        if isinstance(service, _LazyService): # not instantiated by another thread meanwhile
+            start = time.time()
+            instance = service.factory()
+            _service_registry[name] = instance
+            _registry_generation[0] += 1
+            logger.info("instantiated lazy service %s (%.3fs)" % (name, time.time() - start))
+            return instance
+        return service
+
+def serviceHandle(name):
+    """Returns the ServiceHandle for the service {name} (see module description). The service does not need to be registered yet."""
+    handle = _handles.get(name)
+    if handle is None:
+        handle = _handles.setdefault(name, ServiceHandle(name))
+    return handle
+
+class ServiceHandle(object):
+    """
+    Reference to the service {name} which is resolved via getService on first use and again only after the registry changed.
+    Calling the handle returns the service. Other attributes are looked up on the service, so a handle can be passed where the
+    service is expected (e.g. handle.get(...) for the config service), as long as the service is not used as base class.
+    """
+    __slots__ = ('name', '_resolved')
+
+    def __init__(self, name):
+        self.name = name
+        self._resolved = (None, None) # (generation of the registry, service), replaced as a whole so threads see a consistent pair
+
+    def __call__(self):
+        generation, service = self._resolved
+        if generation != _registry_generation[0]:
+            generation = _registry_generation[0] # read before resolving, so a change meanwhile leads to resolving again
+            service = getService(self.name)
+            self._resolved = (generation, service)
+        return service
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'): # do not forward special attributes (e.g. looked up by copy or pickle)
+            raise AttributeError(attr)
+        return getattr(self(), attr)
+
+    def __repr__(self):
+        return "<ServiceHandle %s>" % (self.name,)
 
 def getManifest(name):
     """
@@ -0,0 +1,143 @@
+"""
+Lightweight tracing of requests.
+
+A trace is started per request (see start_trace/finish_trace, e.g. in the XML-RPC dispatcher) and records the spans opened in the same thread:
+    with trace.span('mongodb.lookup'):
+        ...
+or
+    @trace.traced('geniutil.verify_credential')
+    def verify_credential(...):
+
+If no trace is active in the current thread, opening a span costs a single thread-local lookup.
+Spans opened in other threads (e.g. thread pools) are not recorded.
+"""
+import time
+import json
+import threading
+import functools
+
+_local = threading.local()
+
+class Span(object):
+    """A timed section of a request. The {children} are the spans opened while this span was open."""
+    __slots__ = ('name', 'start', 'end', 'children')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.time()
+        self.end = None
+        self.children = []
+
+    @property
+    def duration(self):
+        return (self.end or time.time()) - self.start
+
+    @property
+    def self_time(self):
+        """The time spent in this span, but not in one of its children."""
+        return self.duration - sum(c.duration for c in self.children)
+
+def start_trace(name):
+    """Starts a new trace for the current thread (an active trace is dropped) and returns its root span."""
+    root = Span(name)
+    _local.stack = [root]
+    return root
+
+def finish_trace():
+    """Ends the current thread's trace and returns its root span (or None if there is no active trace)."""
+    stack = getattr(_local, 'stack', None)
+    _local.stack = None
+    if not stack:
+        return None
+    root = stack[0]
+    root.end = time.time()
+    return root
+
+class span(object):
+    """Context manager recording a span named {name} in the current thread's trace (does nothing if there is none)."""
+    __slots__ = ('_name', '_span', '_stack')
+
+    def __init__(self, name):
+        self._name = name
+        self._span = None
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack:
+            self._span = Span(self._name)
+            self._stack = stack
+            stack[-1].children.append(self._span)
+            stack.append(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self._span is not None:
+            self._span.end = time.time()
+            if self._stack and self._stack[-1] is self._span:
+                self._stack.pop()
+        return False
+
+def traced(name):
+    """Decorator which records each call of the function as span named {name}."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not getattr(_local, 'stack', None): # shortcut if there is no trace
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def format_trace(root):
+    """
+    Returns a human-readable breakdown of the trace (one line per span name and level).
+    Sibling spans with the same name are combined, e.g. "mongodb.lookup x3  12.1ms (self 12.1ms)".
+    """
+    lines = []
+    def walk(spans, depth):
+        groups = [] # list of (name, [spans]) in the order of first occurrence
+        by_name = {}
+        for s in spans:
+            if s.name not in by_name:
+                by_name[s.name] = []
+                groups.append((s.name, by_name[s.name]))
+            by_name[s.name].append(s)
+        for name, group in groups:
+            count = " x%i" % (len(group),) if len(group) > 1 else ""
+            lines.append("%s%s%s  %.1fms (self %.1fms)" % ("  " * depth, name, count, sum(s.duration for s in group) * 1000, sum(s.self_time for s in group) * 1000))
+            walk([c for s in group for c in s.children], depth + 1)
+    walk([root], 0)
+    return "\n".join(lines)
+
+def trace_to_dict(root):
+    """Returns the trace as nested dicts with the keys name, start (epoch), duration (seconds) and children."""
+    return {'name' : root.name, 'start' : root.start, 'duration' : root.duration, 'children' : [trace_to_dict(c) for c in root.children]}
+
+class SlowTraceWriter(object):
+    """
+    Writes the traces which took at least {threshold} seconds: as breakdown (see format_trace) to the {log} or, if a {path} is given,
+    as JSON object (see trace_to_dict) per line to the file.
+    """
+    def __init__(self, threshold, log, path=None):
+        self.threshold = threshold
+        self._log = log
+        self._path = path
+        self._lock = threading.Lock()
+
+    def emit(self, root):
+        """Writes the trace with the {root} span if it was slow. Returns True if it has been written."""
+        if (root is None) or (root.duration < self.threshold):
+            return False
+        if not self._path:
+            self._log.warning("Slow request (%.3fs):\n%s" % (root.duration, format_trace(root)))
+            return True
+        try:
+            line = json.dumps(trace_to_dict(root))
+            with self._lock:
+                with open(self._path, 'a') as f:
+                    f.write(line + "\n")
+        except (IOError, OSError, ValueError) as e:
+            self._log.warning("Could not write the trace of a slow request (%s)" % (e,))
+            return False
+        return True
@@ -5,22 +5,34 @@ import getopt
 from amsoil import config
 from amsoil.core import pluginmanager as pm
 
+STARTUP_PROFILE_PATH = config.expand_amsoil_path('log/startup.prof')
+
 def print_usage():
-    print "USAGE: ./main.py [--help] [--worker]"
+    print "USAGE: ./main.py [--help] [--worker] [--profile-startup]"
     print
     print "When no option is specified, the server will be started."
     print
-    print "  --help    Print this help message."
-    print "  --worker  Starts the worker process instead of the RPC server."
+    print "  --help             Print this help message."
+    print "  --worker           Starts the worker process instead of the RPC server."
+    print "  --profile-startup  Loads the plugins under cProfile, prints the plugins' setup times and the most expensive"
+    print "                     functions and exits (the full profile is saved to %s)." % (STARTUP_PROFILE_PATH,)
+
+def profile_startup():
+    import cProfile, pstats
+    profiler = cProfile.Profile()
+    profiler.runcall(pm.init, config.PLUGINS_PATH)
+    profiler.dump_stats(STARTUP_PROFILE_PATH)
+    print pm.setup_report()
+    print
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(30)
+    print "Saved the profile to %s (e.g. python -m pstats %s)" % (STARTUP_PROFILE_PATH, STARTUP_PROFILE_PATH)
 
 def main():
     # set home environment variable to something (needed for apache deployment)
     os.environ['HOME'] = config.expand_amsoil_path('~')
     
-    # load plugins
-    pm.init(config.PLUGINS_PATH)
     try:
-        opts, args = getopt.getopt(sys.argv[1:], 'hw', ['help', 'worker'])
+        opts, args = getopt.getopt(sys.argv[1:], 'hw', ['help', 'worker', 'profile-startup'])
     except getopt.GetoptError as e:
         print "Wrong arguments: " + str(e)
         print
@@ -30,11 +42,20 @@ def main():
         if option in ['-h', '--help']:
             print_usage()
             sys.exit(0)
+        if option == '--profile-startup':
+            profile_startup()
+            sys.exit(0)
+
+    for option, opt_arg in opts:
         if option in ['-w', '--worker']:
+            # only set up the worker, the plugins of the services used by the jobs are set up when a job asks for them
+            pm.init(config.PLUGINS_PATH, services=['worker'])
             worker = pm.getService('worker')
             worker.WorkerServer().runServer()
             sys.exit(0)
-    
+
+    # load plugins
+    pm.init(config.PLUGINS_PATH)
     rpcserver = pm.getService('rpcserver')
     rpcserver.runServer()
 
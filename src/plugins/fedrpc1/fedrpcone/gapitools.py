@@ -1,6 +1,9 @@
 import traceback
 from exceptions import *
 
+import amsoil.core.pluginmanager as pm
+queryengine = pm.getService('queryengine')
+
 
 # --- deal with the GENI CH API returns
 def form_error_return(logger, e):
@@ -38,8 +41,9 @@ def match_and_filter(list_of_dicts, field_filter, field_match):
     """
     Takes a list of dicts and applies the given filter and matches the results (please GENI Federation API on how matching and filtering works).
     if field_filter is None the unfiltered list is returned.
+    The spec is compiled once per call (see queryengine), the result is the same as filter_fields/does_match_fields for each dict.
     """
-    return [filter_fields(d, field_filter) for d in list_of_dicts if does_match_fields(d, field_match)]
+    return queryengine.match_and_filter(list_of_dicts, field_filter, field_match)
 
 def filter_fields(d, field_filter):
     """Takes a dictionary and applies the filter. Returns the unfiltered d if None is given."""
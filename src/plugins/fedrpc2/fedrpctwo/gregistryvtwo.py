@@ -9,6 +9,10 @@ xmlrpc = pm.getService('xmlrpc')
 class GRegistryv2Handler(xmlrpc.Dispatcher):
     """
     Handle XML-RPC Federation Registry API calls.
+
+    The calls are unauthenticated and their results only change with the registry, so successful
+    responses are kept pre-marshalled (see _cached_return). They are rebuilt when the registry is reloaded.
+    The 'get_version' response is memoised by the delegate and, like the SA's and MA's, only pre-marshalled if 'delegatetools.premarshal_version' is set.
     """
 
     def __init__(self):
@@ -17,6 +21,7 @@ class GRegistryv2Handler(xmlrpc.Dispatcher):
         """
         super(GRegistryv2Handler, self).__init__(logger)
         self._api_tools = pm.getService('apitools')
+        self._delegate_tools = pm.getService('delegatetools')
         self._delegate = None
 
     @serviceinterface
@@ -44,7 +49,7 @@ class GRegistryv2Handler(xmlrpc.Dispatcher):
             result = self._delegate.get_version()
         except Exception as e:
             return self._api_tools.form_error_return(logger, e)
-        return self._api_tools.form_success_return(result)
+        return self._api_tools.form_version_return(result)
 
     def lookup(self, type_, _, options):
         """
@@ -59,10 +64,12 @@ class GRegistryv2Handler(xmlrpc.Dispatcher):
         """
         try:
             match, filter_ = self._api_tools.fetch_match_and_filter(options)
-            result = self._delegate.lookup(type_, match, filter_, options)
+            key = self._lookup_key(type_, match, filter_, options)
+            if key is None:
+                return self._api_tools.form_success_return(self._delegate.lookup(type_, match, filter_, options))
+            return self._cached_return(key, lambda: self._delegate.lookup(type_, match, filter_, options))
         except Exception as e:
             return self._api_tools.form_error_return(logger, e)
-        return self._api_tools.form_success_return(result)
 
     def lookup_authorities_for_urns(self, urns):
         """
@@ -85,10 +92,35 @@ class GRegistryv2Handler(xmlrpc.Dispatcher):
 
         """
         try:
-            result = self._delegate.get_trust_roots(self.requestCertificate())
+            return self._cached_return(('get_trust_roots',), lambda: self._delegate.get_trust_roots(self.requestCertificate()))
         except Exception as e:
             return self._api_tools.form_error_return(logger, e)
-        return self._api_tools.form_success_return(result)
+
+    def _cached_return(self, key, call):
+        """
+        Return the pre-marshalled success return for the given key.
+
+        The {call} to the delegate is only made if there is no valid cached response (see DelegateTools.memoise).
+        Exceptions raised by {call} are passed on and nothing is cached.
+        """
+        return self._delegate_tools.memoise(('GREGISTRYV2',) + key, lambda: xmlrpc.marshalResponse(self._api_tools.form_success_return(call())))
+
+    def _lookup_key(self, type_, match, filter_, options):
+        """
+        Normalise the lookup options into a cache key.
+
+        The order of the filter and of the values to match (OR) do not change the result, so they are sorted.
+        Returns None if the options can not be normalised (e.g. unexpected types), the response is not cached then.
+        """
+        try:
+            match_key = tuple(sorted((k, tuple(sorted(v)) if isinstance(v, list) else v) for (k, v) in match.iteritems()))
+            filter_key = tuple(sorted(filter_)) if filter_ else ()
+            other_key = tuple(sorted((k, v) for (k, v) in options.iteritems() if k not in ('match', 'filter')))
+            key = ('lookup', type_, match_key, filter_key, other_key)
+            hash(key)
+        except (TypeError, AttributeError):
+            return None
+        return key
 
 class GRegistryv2DelegateBase(object):
     """
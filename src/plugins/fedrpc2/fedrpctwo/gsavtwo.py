@@ -47,7 +47,7 @@ class GSAv2Handler(xmlrpc.Dispatcher):
             result = self._delegate.get_version()
         except Exception as e:
             return self._api_tools.form_error_return(logger, e)
-        return self._api_tools.form_success_return(result)
+        return self._api_tools.form_version_return(result)
 
     def create(self, type_, credentials, options):
         """
@@ -13,6 +13,10 @@ class APITools(object):
 
     def __init__(self):
         self._database = pm.getService('mongodb')
+        self._xmlrpc = pm.getService('xmlrpc')
+        self._endpoint_revision = 0
+        self._marshalled = [] #: list of (result, marshalled response) tuples, see form_cached_success_return
+        self._premarshal_version = pm.getService('config').get("delegatetools.premarshal_version")
 
     # --- fetch filter and match fields from options
     @staticmethod
@@ -45,6 +49,41 @@ class APITools(object):
         """Assembles a GENI compliant return result for successful methods."""
         return { 'code' : 0, 'value' : result, 'output' : None }
 
+    @serviceinterface
+    def form_version_return(self, version):
+        """
+        Assembles a GENI compliant return result for a (memoised) 'get_version' response.
+
+        If 'delegatetools.premarshal_version' is set, the return is pre-marshalled (see form_cached_success_return).
+        """
+        if self._premarshal_version:
+            return self.form_cached_success_return(version)
+        return self.form_success_return(version)
+
+    MARSHALLED_CACHE_SIZE = 16 #: number of pre-marshalled responses kept by form_cached_success_return
+
+    @serviceinterface
+    def form_cached_success_return(self, result):
+        """
+        Assembles a GENI compliant return result for successful methods and returns it pre-marshalled.
+
+        The marshalled response is remembered for the given result object (identity, not equality),
+        so returning the same (memoised) object again does not serialize it again.
+        Hence, the result must not be modified after it has been passed here.
+
+        Args:
+            result: the value to return (should be a memoised object, see DelegateTools.memoise)
+
+        Returns:
+            a MarshalledResponse (see xmlrpc service), which can be returned by the handler method
+        """
+        for cached_result, marshalled in self._marshalled:
+            if cached_result is result:
+                return marshalled
+        marshalled = self._xmlrpc.marshalResponse(self.form_success_return(result))
+        self._marshalled = ([(result, marshalled)] + self._marshalled)[:APITools.MARSHALLED_CACHE_SIZE]
+        return marshalled
+
 
     # # --- helpers for filtering/selecting stuff
     # @staticmethod
@@ -80,4 +119,12 @@ class APITools(object):
         For example register_endpoint(type='sa', url='/ma/2')
         """
         self._database.update('endpoint', kwargs, kwargs, upsert=True)
+        self._endpoint_revision += 1
+
+    @serviceinterface
+    def endpoint_revision(self):
+        """
+        Return a number which is increased each time an endpoint is registered (by this process).
+        """
+        return self._endpoint_revision
 
@@ -1,9 +1,11 @@
 from amsoil.core import serviceinterface
+from amsoil.core import trace
 from amsoil.config import expand_amsoil_path
 import amsoil.core.pluginmanager as pm
 import amsoil.core.log
 
 from delegateexceptions import *
+import queryengine
 from apiexceptionsv2 import *
 
 
@@ -12,6 +14,7 @@ import json
 import uuid
 import pyrfc3339, datetime, pytz
 import re
+import time
 
 logger = amsoil.core.log.getLogger('delegatetools')
 
@@ -22,6 +25,7 @@ class DelegateTools(object):
 
     JSON_COMMENT = "__comment" #: delimeter for comments in loaded JSON files (config.json and defaults.json)
     REQUIRED_METHOD_KEYS = ['members_to_add', 'members_to_change', 'members_to_remove'] #: list of valid keys to be passed as 'options' in a 'modify_membership' call
+    MEMOISE_SIZE = 256 #: maximum number of values kept by 'memoise'
     GET_VERSION_FIELDS = ['URN', 'IMPLEMENTATION', 'SERVICES', 'CREDENTIAL_TYPES', 'ROLES', 'SERVICE_TYPES', 'API_VERSIONS'] #: list of fields possible in a 'get_version' API call response
 
     def __init__(self):
@@ -31,6 +35,12 @@ class DelegateTools(object):
         self.STATIC = {} #: holds static configuration and settings loaded from JSON files (config.json and defaults.json)
         self._load_files()
         self._combine_fields()
+        self._revision = 0
+        self._memoised = {} #: maps memoisation keys to (token, expiry time, value) tuples, see memoise
+        config = pm.getService("config")
+        self._config = config
+        self._api_tools = pm.getService('apitools')
+        self._memoise_ttl = config.get("delegatetools.version_cache_ttl")
 
     def _load_files(self):
         """
@@ -41,13 +51,99 @@ class DelegateTools(object):
 
         """
         paths = self._get_paths()
+        static, mtimes = {}, {}
         for path_key, path_value in paths.iteritems():
             if not os.path.exists(path_value):
                 raise ConfigFileMissing(path_value)
             try:
-                self.STATIC[path_key] = self._strip_comments(json.load(open(path_value)))
+                mtimes[path_value] = os.path.getmtime(path_value)
+                static[path_key] = self._strip_comments(json.load(open(path_value)))
             except Exception:
                 raise MalformedConfigFile(path_value, '')
+        self.STATIC.update(static) # only replace the content if all files could be loaded
+        self._mtimes = mtimes
+
+    def _files_changed(self):
+        """
+        Check if one of the loaded JSON files has been modified since loading.
+        """
+        for path, mtime in self._mtimes.iteritems():
+            try:
+                if os.path.getmtime(path) != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    @serviceinterface
+    def reload(self):
+        """
+        Reload the JSON configuration and default files.
+
+        Memoised values (see memoise) are invalidated.
+
+        Raises:
+            MalformedConfigFile: An error occured when loading the JSON file.
+
+        """
+        self._load_files()
+        self._combine_fields()
+        self._revision += 1
+
+    @serviceinterface
+    def revision(self):
+        """
+        Get a number which is increased each time the JSON files are reloaded.
+
+        Returns:
+            the revision of the loaded files
+        """
+        return self._revision
+
+    def _memoise_token(self):
+        """
+        Get a token which changes whenever the registry, the config or the endpoint table changes in this process.
+        """
+        return (self._revision, self._config.revision(), self._api_tools.endpoint_revision())
+
+    @serviceinterface
+    def memoise(self, key, builder):
+        """
+        Get the value for a given key, which is built only if it is not memoised yet.
+
+        The value is rebuilt when the JSON files are reloaded, a config item is changed or an endpoint is registered.
+        Since changes in other processes can not be noticed, the value expires after 'delegatetools.version_cache_ttl' seconds.
+        When an expired value is rebuilt, the JSON files are reloaded if they have been modified meanwhile.
+        The memoised value is shared among callers and must not be modified.
+        At most MEMOISE_SIZE values are kept, further values are built on every call until old ones expire.
+
+        Args:
+            key: unique name of the value (e.g. 'SA_VERSION')
+            builder: callable without arguments, which builds the value
+
+        Returns:
+            the memoised value
+        """
+        if not self._memoise_ttl:
+            return builder()
+        token = self._memoise_token()
+        now = time.time()
+        entry = self._memoised.get(key)
+        if entry and entry[0] == token and entry[1] > now:
+            return entry[2]
+        if entry and self._files_changed():
+            logger.info("JSON files have changed, reloading them.")
+            try:
+                self.reload()
+            except DelegateToolsException as e:
+                logger.warning("Could not reload the JSON files, keeping the loaded ones (%s)." % (str(e),))
+            token = self._memoise_token()
+        value = builder()
+        if len(self._memoised) >= DelegateTools.MEMOISE_SIZE:
+            self._memoised = dict((k, e) for (k, e) in self._memoised.iteritems() if e[0] == token and e[1] > now)
+        if len(self._memoised) < DelegateTools.MEMOISE_SIZE:
+            self._memoised[key] = (token, now + self._memoise_ttl, value)
+        return value
 
     def _combine_fields(self):
         """
@@ -103,6 +199,7 @@ class DelegateTools(object):
 
 
     @serviceinterface
+    @trace.traced('delegatetools.validate_expiration_time')
     def validate_expiration_time(self, original_value, value_in_question, type_=None):
         """
         Validate the expiration time value passed to Update or Create Methods.
@@ -271,6 +368,7 @@ class DelegateTools(object):
 
     @staticmethod
     @serviceinterface
+    @trace.traced('delegatetools.member_check')
     def member_check(required_field_keys, options):
         """
         Check correctly formed options for 'modify_membership' method.
@@ -300,6 +398,7 @@ class DelegateTools(object):
 
     @staticmethod
     @serviceinterface
+    @trace.traced('delegatetools.slice_name_check')
     def slice_name_check(slice_name):
         if not re.match(r'^[a-zA-Z0-9][A-Za-z0-9-]{1,19}$', slice_name):
             raise GFedv2ArgumentError('SLICE_NAME field must be <= 19 characters, must only contain alphanumeric '
@@ -307,6 +406,7 @@ class DelegateTools(object):
 
     @staticmethod
     @serviceinterface
+    @trace.traced('delegatetools.object_creation_check')
     def object_creation_check(fields, whitelist):
         """
         Check if the given fields can be used in creating an object.
@@ -329,6 +429,7 @@ class DelegateTools(object):
 
     @staticmethod
     @serviceinterface
+    @trace.traced('delegatetools.object_update_check')
     def object_update_check(fields, whitelist):
         """
         Check if the given fields can be used in updating an object.
@@ -346,6 +447,7 @@ class DelegateTools(object):
             raise GFedv2ArgumentError('Cannot pass the following key(s) when updating an object : ' + ', '.join(whitelist))
 
     @serviceinterface
+    @trace.traced('delegatetools.object_consistency_check')
     def object_consistency_check(self, type_, fields):
         """
         Check that fields conform to a predefined type by calling a corresponding method.
@@ -374,6 +476,7 @@ class DelegateTools(object):
  
     @staticmethod
     @serviceinterface
+    @trace.traced('delegatetools.decompose_slice_urns')
     def decompose_slice_urns(match_value_to_decompose):
         """
         Create individual SLICE_URN entries to match from a list of SLICE_URN Values. For example,
@@ -425,42 +528,14 @@ class DelegateTools(object):
         return { d[key] : dict(filter(lambda (k,v): (k != key), d.iteritems())) for d in list_}
 
     @serviceinterface
+    @trace.traced('delegatetools.match_and_filter')
     def match_and_filter(self, list_of_dicts, field_filter, field_match):
         """
         Takes a list of dicts and applies the given filter and matches the results (please GENI Federation API on how matching and filtering works).
         if field_filter is None the unfiltered list is returned.
+        {list_of_dicts} may also be an IndexedRows instance (see queryengine), so the lookup can use its indexes.
         """
-        return [self._filter_fields(d, field_filter) for d in list_of_dicts if self._does_match_fields(d, field_match)]
-
-    def _does_match_fields(self, d, field_match):
-        """
-        Returns if the given dictionary matches the {field_match}.
-        {field_match} may look like: { 'must_be' : 'this', 'and_any_of_' : ['tho', 'se']}
-        """
-        if not field_match:
-            return True
-        for mk, mv in field_match.iteritems(): # each matches must be fulfilled
-            val = d[mk]
-            if isinstance(mv, list): # any of those values (OR)
-                found_any = False;
-                for mvv in mv:
-                    if val == mvv:
-                        found_any = True
-                if not found_any:
-                    return False
-            else: # or explicitly this one
-                if not val == mv:
-                    return False
-        return True
-
-    def _filter_fields(self, d, field_filter):
-        """Takes a dictionary and applies the filter. Returns the unfiltered d if None is given."""
-        if not field_filter:
-            return d
-        result = {}
-        for f in field_filter:
-            result[f] = d[f]
-        return result
+        return queryengine.match_and_filter(list_of_dicts, field_filter, field_match)
 
 class TypeCheck():
     """
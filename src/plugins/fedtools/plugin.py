@@ -3,24 +3,24 @@ from resourcemanagertools import ResourceManagerTools
 from delegatetools import DelegateTools
 from apitools import APITools
 import apiexceptionsv1, apiexceptionsv2
+import queryengine
 
 def setup():
 
     pm.registerService('apiexceptionsv1', apiexceptionsv1)
     pm.registerService('apiexceptionsv2', apiexceptionsv2)
-
-    api_tools = APITools()
-    pm.registerService('apitools', api_tools)
-
-    resource_manager_tools = ResourceManagerTools()
-    pm.registerService('resourcemanagertools', resource_manager_tools)
+    pm.registerService('queryengine', queryengine)
 
     config = pm.getService("config")
     config.install("delegatetools.config_path", "deploy/config.json", "JSON file with configuration data for CH, SA, MA")
     config.install("delegatetools.supplemetary_fileds_path", "deploy/supplementary_fields.json", "JSON file with Supplementary Fields for CH, SA, MA",True)
     config.install("delegatetools.service_registry_path","deploy/registry.json", "JSON file with Services supported by the registry",True)
     config.install("delegatetools.defaults_path", "src/plugins/fedtools/defaults.json", "JSON file with default data for CH, SA, MA", True)
+    config.install("delegatetools.version_cache_ttl", 60, "Seconds a memoised 'get_version' response is kept at most (0 disables memoisation). Changes made in this process invalidate it right away.")
+    config.install("delegatetools.premarshal_version", False, "Keep memoised 'get_version' responses as pre-marshalled XML-RPC bytes.")
 
-    delegate_tools = DelegateTools()
-    pm.registerService('delegatetools', delegate_tools)
+    # created on first use (they connect to the database and read the JSON files)
+    pm.registerService('apitools', APITools, lazy=True)
+    pm.registerService('resourcemanagertools', ResourceManagerTools, lazy=True)
+    pm.registerService('delegatetools', DelegateTools, lazy=True)
 
@@ -0,0 +1,140 @@
+"""
+Matching and filtering of in-memory result sets (please see the GENI Federation API on how matching and filtering works).
+
+A match/filter spec is compiled once into a Query, which can then be applied to a list of dicts or to IndexedRows.
+The results (including raised KeyErrors) are identical to the plain loop implementation:
+    [filter_fields(d, field_filter) for d in list_of_dicts if does_match_fields(d, field_match)]
+
+Example:
+    query = compile_query({'TYPE' : ['a', 'b'], 'NAME' : 'x'}, ['URN'])
+    result = query.apply(list_of_dicts)
+"""
+
+SET_TYPES = (str, unicode, int, long, bool, type(None)) #: types for which set membership gives the same result as comparing with ==
+
+def _set_safe(values):
+    """Returns True if a set lookup on these values behaves like comparing each of them with ==."""
+    for v in values:
+        if type(v) not in SET_TYPES:
+            return False
+    return True
+
+class Query(object):
+    """
+    Compiled match/filter spec. Please use compile_query(...) to create one.
+    """
+
+    def __init__(self, field_match, field_filter):
+        self._filter = list(field_filter) if field_filter else None
+        self._match = [] # list of (key, kind, value) tuples in the order of field_match
+        if field_match:
+            for mk, mv in field_match.iteritems():
+                if isinstance(mv, list): # any of those values (OR)
+                    if _set_safe(mv):
+                        self._match.append((mk, 'in', frozenset(mv)))
+                    else:
+                        self._match.append((mk, 'any', list(mv)))
+                else: # or explicitly this one
+                    self._match.append((mk, 'eq', mv))
+
+    def matches(self, d):
+        """Returns if the given dictionary matches the compiled match spec."""
+        for mk, kind, mv in self._match:
+            val = d[mk]
+            if kind == 'eq':
+                if not val == mv:
+                    return False
+            elif kind == 'in':
+                if type(val) in SET_TYPES:
+                    if val not in mv:
+                        return False
+                else: # e.g. unhashable values, compare one by one
+                    if not any(val == mvv for mvv in mv):
+                        return False
+            else:
+                if not any(val == mvv for mvv in mv):
+                    return False
+        return True
+
+    def project(self, d):
+        """Applies the compiled filter to the dictionary. Returns the unfiltered d if no filter was given."""
+        if not self._filter:
+            return d
+        return dict((f, d[f]) for f in self._filter)
+
+    def apply(self, rows):
+        """Returns the matched and filtered rows. {rows} can either be a list of dicts or IndexedRows."""
+        if isinstance(rows, IndexedRows):
+            positions = rows.candidates(self._match)
+            if positions is not None:
+                all_rows = rows.rows
+                return [self.project(all_rows[i]) for i in positions]
+            rows = rows.rows
+        if not self._match:
+            return [self.project(d) for d in rows]
+        return [self.project(d) for d in rows if self.matches(d)]
+
+def compile_query(field_match, field_filter):
+    """Compiles the {field_match} (e.g. { 'must_be' : 'this', 'and_any_of_' : ['tho', 'se']}) and the {field_filter} (list of keys) into a Query."""
+    return Query(field_match, field_filter)
+
+def match_and_filter(list_of_dicts, field_filter, field_match):
+    """Shortcut for compile_query(field_match, field_filter).apply(list_of_dicts)."""
+    if not list_of_dicts: # the spec is not even looked at if there is nothing to match
+        return []
+    return Query(field_match, field_filter).apply(list_of_dicts)
+
+class IndexedRows(object):
+    """
+    Immutable list of dicts with (lazily built) hash indexes per field.
+    Please do not modify the rows after creating the IndexedRows.
+
+    A Query uses the indexes if all rows have the matched fields and the values can be compared via hashing.
+    Otherwise the rows are scanned, so the results are the same as for the plain list.
+    """
+
+    def __init__(self, rows):
+        self.rows = tuple(rows)
+        self._indexes = {} # maps field names to {value : [positions]} or None if the field can not be indexed
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def _index(self, field):
+        """Returns the index for the field or None if a row lacks the field or has a value which is not in SET_TYPES."""
+        try:
+            return self._indexes[field]
+        except KeyError:
+            pass
+        index = {}
+        for i, row in enumerate(self.rows):
+            if field not in row or type(row[field]) not in SET_TYPES:
+                index = None
+                break
+            index.setdefault(row[field], []).append(i)
+        self._indexes[field] = index
+        return index
+
+    def candidates(self, match):
+        """Returns the sorted positions of the rows matching the compiled {match} or None if the indexes can not be used."""
+        positions = None
+        for mk, kind, mv in match:
+            if kind == 'in':
+                values = mv
+            elif kind == 'eq' and type(mv) in SET_TYPES:
+                values = (mv,)
+            else:
+                return None
+            index = self._index(mk)
+            if index is None:
+                return None
+            found = set()
+            for v in values:
+                found.update(index.get(v, ()))
+            positions = found if positions is None else (positions & found)
+        if positions is None:
+            return range(len(self.rows))
+        return sorted(positions)
@@ -1,4 +1,5 @@
 from amsoil.core import serviceinterface
+from amsoil.core import trace
 import amsoil.core.pluginmanager as pm
 import amsoil.core.log
 from apiexceptionsv2 import *
@@ -29,6 +30,7 @@ class ResourceManagerTools(object):
         self._database.set_index(collection, index)
 
     @serviceinterface
+    @trace.traced('rmtools.member_modify')
     def member_modify(self, authority, type_, urn, options, member_key, urn_key):
         """
         Modify a membership in the database.
@@ -88,6 +90,7 @@ class ResourceManagerTools(object):
             self._database.update(authority, update_fields, members_dict)
 
     @serviceinterface
+    @trace.traced('rmtools.member_lookup')
     def member_lookup(self, authority, type_, key, value, extra_fields=None):
         """
         Lookup membership (SLICE_MEMBERSHIP, PROJECT_MEMBERSHIP) in the database.
@@ -110,6 +113,7 @@ class ResourceManagerTools(object):
         return result
 
     @serviceinterface
+    @trace.traced('rmtools.object_create')
     def object_create(self, authority, fields, type_):
         """
         Create object (SLICE, MEMBER, etc.) in the database.
@@ -135,6 +139,7 @@ class ResourceManagerTools(object):
         return result
 
     @serviceinterface
+    @trace.traced('rmtools.object_update')
     def object_update(self, authority, fields, type_, urn):
         """
         Update object (SLICE, MEMBER, etc.) in the database.
@@ -157,6 +162,7 @@ class ResourceManagerTools(object):
         return None
 
     @serviceinterface
+    @trace.traced('rmtools.object_lookup')
     def object_lookup(self, authority, type_, match, filter_):
         """
         Lookup object (SLICE, MEMBER, etc.) in the database.
@@ -199,6 +205,7 @@ class ResourceManagerTools(object):
         return projection
 
     @serviceinterface
+    @trace.traced('rmtools.object_delete')
     def object_delete(self, authority, type_, urn):
         """
         Remove object (SLICE, MEMBER, etc.) from the database.
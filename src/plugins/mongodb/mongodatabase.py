@@ -3,6 +3,7 @@ import pymongo
 import amsoil.core.pluginmanager as pm
 
 from amsoil.core import serviceinterface
+from amsoil.core import trace
 
 import amsoil.core.log
 logger=amsoil.core.log.getLogger('mongodb')
@@ -25,7 +26,7 @@ class MongoDB(object):
         self._database = client[database_name]
 
     @serviceinterface
-    def set_index(self, collection, index):
+    def set_index(self, collection, index, unique=True):
         """
         Set a unique index in a collection.
 
@@ -35,11 +36,16 @@ class MongoDB(object):
         Args:
             collection: name of collection ('sa' or 'ma')
             index: name of index ('SLICE_URN' for example)
+            unique: False creates a plain (non-unique) index, e.g. for sorting
 
         """
-        self._database[collection].ensure_index(index, unique=True, sparse=True)
+        if unique:
+            self._database[collection].ensure_index(index, unique=True, sparse=True)
+        else:
+            self._database[collection].ensure_index(index)
 
     @serviceinterface
+    @trace.traced('mongodb.create')
     def create(self, collection, document):
         """
         Create a new entry within a collection.
@@ -59,7 +65,8 @@ class MongoDB(object):
             raise Exception(e)
 
     @serviceinterface
-    def update(self, collection, query, update, upsert=False):
+    @trace.traced('mongodb.update')
+    def update(self, collection, query, update, upsert=False, multi=False):
         """
         Update an existing entry within a collection.
 
@@ -67,11 +74,18 @@ class MongoDB(object):
             collection: name of collection ('ma' or 'sa')
             query: dictionary of key-value pairs to search for
             update: dictionary of key-value pairs to update
+            upsert: create the entry if none matches the query
+            multi: update all matching entries (otherwise only the first one)
+
+        Returns:
+            number of updated entries
 
         """
-        self._database[collection].update(query, {"$set": update}, upsert=upsert)
+        result = self._database[collection].update(query, {"$set": update}, upsert=upsert, multi=multi)
+        return result['n'] if result else 0
 
     @serviceinterface
+    @trace.traced('mongodb.delete')
     def delete(self, collection, query):
         """
         Remove existing entry within a collection.
@@ -80,11 +94,16 @@ class MongoDB(object):
             collection: name of collection ('ma' or 'sa')
             query: dictionary of key-value pairs to search for
 
+        Returns:
+            number of removed entries
+
         """
-        self._database[collection].remove(query)
+        result = self._database[collection].remove(query)
+        return result['n'] if result else 0
 
     @serviceinterface
-    def lookup(self, collection, criteria, projection={}):
+    @trace.traced('mongodb.lookup')
+    def lookup(self, collection, criteria, projection={}, sort=None, limit=0):
         """
         Lookup existing entries within a collection.
 
@@ -95,6 +114,8 @@ class MongoDB(object):
             collection: name of collection ('ma' or 'sa')
             criteria: dictionary of key-value pairs to search for
             projection: list of keys to return in result
+            sort: list of (key, direction) tuples (e.g. [('TIME', pymongo.ASCENDING)])
+            limit: maximum number of results (0 means no limit)
 
         Returns:
             list of results in dictionary format
@@ -102,7 +123,7 @@ class MongoDB(object):
         """
 
         projection['_id'] = False
-        result = self._database[collection].find(criteria, projection)
+        result = self._database[collection].find(criteria, projection, sort=sort, limit=limit)
         objects = []
         for _object in result:
             objects.append(_object)
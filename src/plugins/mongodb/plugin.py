@@ -4,5 +4,5 @@ from amsoil.config import (db_ip, db_port, db_name)
 
 
 def setup():
-    mongo_database = MongoDB(db_ip, db_port, db_name)
-    pm.registerService('mongodb', mongo_database)
\ No newline at end of file
+    # connect on first use, so processes which do not need the database do not wait for it
+    pm.registerService('mongodb', lambda: MongoDB(db_ip, db_port, db_name), lazy=True)
\ No newline at end of file
@@ -28,10 +28,18 @@ class ORegistryv2Delegate(GRegistryv2DelegateBase):
         """
         Get implementation details from resource manager. Supplement these with
         additional details specific to the delegate.
+
+        The response is memoised (see DelegateTools.memoise) and must not be modified.
+        """
+        return self._delegate_tools.memoise('REGISTRY_VERSION', self._build_version)
+
+    def _build_version(self):
+        """
+        Assemble the 'get_version' response.
         """
         version = self._delegate_tools.get_version(self._federation_registry_resource_manager)
         version['VERSION'] = VERSION
-        version['FIELDS'] =  self._delegate_tools.get_supplementary_fields(['SERVICE'])
+        version['FIELDS'] = self._delegate_tools.get_supplementary_fields(['SERVICE'])
         return version
 
     def lookup(self, type_, match, filter_, options):
@@ -40,7 +48,7 @@ class ORegistryv2Delegate(GRegistryv2DelegateBase):
         using the resource manager.
         """
         if (type_=='SERVICE'):
-             return self._delegate_tools.match_and_filter(self._federation_registry_resource_manager.lookup_services(), filter_, match)
+             return self._delegate_tools.match_and_filter(self._federation_registry_resource_manager.indexed_services(), filter_, match)
         else:
             raise gfed_ex.GFedv2NotImplementedError("No create method found for object type: " + str(type_))
 
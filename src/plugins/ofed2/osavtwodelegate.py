@@ -30,6 +30,14 @@ class OSAv2Delegate(GSAv2DelegateBase):
         """
         Get implementation details from resource manager. Supplement these with
         additional details specific to the delegate.
+
+        The response is memoised (see DelegateTools.memoise) and must not be modified.
+        """
+        return self._delegate_tools.memoise('SA_VERSION', self._build_version)
+
+    def _build_version(self):
+        """
+        Assemble the 'get_version' response.
         """
         version = self._delegate_tools.get_version(self._slice_authority_resource_manager)
         version['VERSION'] = VERSION
@@ -15,6 +15,11 @@ def setup():
     config = pm.getService('config')
     config.install("ofed.cert_root", "deploy/trusted", "Folder which includes trusted certificates (in .pem format). If relative path, the root is assumed to be git repo root.")
 
+    # build the registry's trust bundle at load time and serve it to the TLS context
+    reg_rm = pm.getService('oregistryrm')
+    reg_rm.trust_bundle()
+    pm.getService('rpcserver').setTrustedCertificates(lambda: reg_rm.trust_bundle())
+
     reg_delegate = ORegistryv2Delegate()
     reg_handler = pm.getService('gregistryv2handler')
     reg_handler.setDelegate(reg_delegate)
@@ -27,6 +27,8 @@ class OMemberAuthorityResourceManager(object):
         """
         super(OMemberAuthorityResourceManager, self).__init__()
         self._resource_manager_tools = pm.getService('resourcemanagertools')
+        self._config = pm.serviceHandle('config')
+        self._api_tools = pm.serviceHandle('apitools')
         self._set_unique_keys()
 
     def _set_unique_keys(self):
@@ -46,8 +48,7 @@ class OMemberAuthorityResourceManager(object):
         the URN.
 
         """
-        config = pm.getService('config')
-        hostname = config.get('flask.hostname')
+        hostname = self._config.getCached('flask.hostname')
         return 'urn:publicid:IDN+' + hostname + '+authority+ma'
 
     def implementation(self):
@@ -77,10 +78,9 @@ class OMemberAuthorityResourceManager(object):
         Form these endpoints into a dictionary suitable for the API call response.
 
         """
-        config = pm.getService('config')
-        hostname = config.get('flask.hostname')
-        port = str(config.get('flask.app_port'))
-        endpoints = pm.getService('apitools').get_endpoints(type=self.AUTHORITY_NAME)
+        hostname = self._config.getCached('flask.hostname')
+        port = str(self._config.getCached('flask.app_port'))
+        endpoints = self._api_tools.get_endpoints(type=self.AUTHORITY_NAME)
         return self._resource_manager_tools.form_api_versions(hostname, port,
             endpoints)
 
@@ -4,6 +4,5 @@ import omemberauthorityexceptions
 from omemberauthorityresourcemanager import OMemberAuthorityResourceManager
 
 def setup():
-    ma_rm = OMemberAuthorityResourceManager()
-    pm.registerService('omemberauthorityrm', ma_rm)
+    pm.registerService('omemberauthorityrm', OMemberAuthorityResourceManager, lazy=True) # the constructor creates the database indexes
     pm.registerService('omemberauthorityexceptions', omemberauthorityexceptions)
\ No newline at end of file
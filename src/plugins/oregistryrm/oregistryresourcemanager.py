@@ -1,3 +1,4 @@
+from amsoil.config import expand_amsoil_path
 import amsoil.core.pluginmanager as pm
 import amsoil.core.log
 logger=amsoil.core.log.getLogger('oregistryrm')
@@ -27,6 +28,9 @@ class ORegistryResourceManager(object):
         self._resource_manager_tools = pm.getService('resourcemanagertools')
         #TODO: this isn't a a delegate!
         self._delegate_tools = pm.getService('delegatetools')
+        self._geniutil = pm.getService('geniutil')
+        self._query_engine = pm.getService('queryengine')
+        self._config = pm.serviceHandle('config')
 
     def urn(self):
         """
@@ -36,8 +40,7 @@ class ORegistryResourceManager(object):
         the URN.
 
         """
-        config = pm.getService('config')
-        hostname = config.get('flask.hostname')
+        hostname = self._config.getCached('flask.hostname')
         return 'urn:publicid:IDN+' + hostname + '+authority+fr'
 
     def implementation(self):
@@ -75,6 +78,14 @@ class ORegistryResourceManager(object):
         """
         return self._uppercase_keys_in_list([e for e in self._delegate_tools.get_registry()["SERVICES"] if (e['service_type'] in self.TYPES)])
 
+    def indexed_services(self):
+        """
+        Return the services (see lookup_services) as IndexedRows (see queryengine), which can be used for repeated lookups.
+
+        The result is memoised (see DelegateTools.memoise) and must not be modified.
+        """
+        return self._delegate_tools.memoise('REGISTRY_INDEXED_SERVICES', lambda: self._query_engine.IndexedRows(self.lookup_services()))
+
     def all_aggregates(self):
         """
         Return all aggregates as defined in the registry config file (registry.json).
@@ -96,29 +107,44 @@ class ORegistryResourceManager(object):
     def all_trusted_certs(self):
         """
         Return all trusted certificates as defined in the registry config file (registry.json).
+
+        The magic markers (INFER_SAs, INFER_MAs) are substituted with the certificates of the slice and member authorities.
+        The result is memoised (see DelegateTools.memoise) and must not be modified.
+        """
+        return self._delegate_tools.memoise('REGISTRY_TRUST_ROOTS', self._expand_trusted_certs)
+
+    def _expand_trusted_certs(self):
+        """
+        Build the tuple of trusted certificates without modifying the loaded registry.
+        """
+        certs = []
+        for cert in self._delegate_tools.get_registry()["TRUST_ROOTS"]:
+            if cert == "INFER_SAs":
+                certs.extend(s['SERVICE_CERT'] for s in self.all_slice_authorities())
+            elif cert == "INFER_MAs":
+                certs.extend(s['SERVICE_CERT'] for s in self.all_member_authorities())
+            else:
+                certs.append(cert)
+        return tuple(certs)
+
+    def trust_bundle(self):
+        """
+        Return the trust bundle (see geniutil.trust_bundle) with the registry's trusted certificates and the ones in 'ofed.cert_root'.
+
+        The bundle is only rebuilt if the registry or the certificate directory changes.
         """
-        certs = self._delegate_tools.get_registry()["TRUST_ROOTS"]
-        #TODO: Subsitute magic markers
-        if "INFER_SAs" in certs:
-            certs.remove("INFER_SAs")
-            for s in self.all_slice_authorities():
-                certs.append(s['SERVICE_CERT'])
-        if "INFER_MAs" in certs:
-            certs.remove("INFER_MAs")
-            for s in self.all_member_authorities():
-                certs.append(s['SERVICE_CERT'])
-        return certs
+        cert_root = self._delegate_tools.memoise('OFED_CERT_ROOT', lambda: expand_amsoil_path(self._config.get('ofed.cert_root')))
+        return self._geniutil.trust_bundle(cert_root, self.all_trusted_certs())
 
     def get_authory_mappings(self, urns):
         """
         Get authority mappings for a set of URNs.
         """
-        geniutil = pm.getService('geniutil')
         if not isinstance(urns, list):
             raise ValueError("Please give a _list_ of URNs")
         result = {}
         for urn in urns:
-            authority, typ, name = geniutil.decode_urn(urn)
+            authority, typ, name = self._geniutil.decode_urn(urn)
             service = None
             if (typ == "slice"):
                 service = self._find_service(self.SA_SERVICE_TYPE, authority)
@@ -134,9 +160,8 @@ class ORegistryResourceManager(object):
         """
         Returns the first service dictionary matching the {typ}e and {urn}. None if none is found.
         """
-        geniutil = pm.getService('geniutil')
         for service in self._delegate_tools.get_registry()['SERVICES']:
-            sauth, styp, sname = geniutil.decode_urn(service['service_urn'])
+            sauth, styp, sname = self._geniutil.decode_urn(service['service_urn'])
             if (service['service_type'] == typ) and (sauth == authority):
                 return service
         return None
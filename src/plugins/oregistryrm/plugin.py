@@ -4,6 +4,5 @@ import oregistryexceptions
 from oregistryresourcemanager import ORegistryResourceManager
 
 def setup():
-    reg_rm = ORegistryResourceManager()
-    pm.registerService('oregistryrm', reg_rm)
+    pm.registerService('oregistryrm', ORegistryResourceManager, lazy=True)
     pm.registerService('oregistryexceptions', oregistryexceptions)
@@ -28,6 +28,8 @@ class OSliceAuthorityResourceManager(object):
         """
         super(OSliceAuthorityResourceManager, self).__init__()
         self._resource_manager_tools = pm.getService('resourcemanagertools')
+        self._config = pm.serviceHandle('config')
+        self._api_tools = pm.serviceHandle('apitools')
         self._set_unique_keys()
 
     #--- 'get_version' methods
@@ -49,8 +51,7 @@ class OSliceAuthorityResourceManager(object):
         the URN.
 
         """
-        config = pm.getService('config')
-        hostname = config.get('flask.hostname')
+        hostname = self._config.getCached('flask.hostname')
         return 'urn:publicid:IDN+' + hostname + '+authority+sa'
 
     def implementation(self):
@@ -80,10 +81,9 @@ class OSliceAuthorityResourceManager(object):
         Form these endpoints into a dictionary suitable for the API call response.
 
         """
-        config = pm.getService('config')
-        hostname = config.get('flask.hostname')
-        port = str(config.get('flask.app_port'))
-        endpoints = pm.getService('apitools').get_endpoints(type=self.AUTHORITY_NAME)
+        hostname = self._config.getCached('flask.hostname')
+        port = str(self._config.getCached('flask.app_port'))
+        endpoints = self._api_tools.get_endpoints(type=self.AUTHORITY_NAME)
         return self._resource_manager_tools.form_api_versions(hostname, port, endpoints)
 
     def credential_types(self):
@@ -107,8 +107,7 @@ class OSliceAuthorityResourceManager(object):
                 yet expired
 
         """
-        config = pm.getService('config')
-        hostname = config.get('flask.hostname')
+        hostname = self._config.getCached('flask.hostname')
 
         fields['SLICE_URN'] = 'urn:publicid+IDN+' + hostname + '+slice+' + fields.get('SLICE_NAME')
         fields['SLICE_UID'] = str(uuid.uuid4())
@@ -166,8 +165,7 @@ class OSliceAuthorityResourceManager(object):
                 has not yet expired
 
         """
-        config = pm.getService('config')
-        hostname = config.get('flask.hostname')
+        hostname = self._config.getCached('flask.hostname')
 
         fields['PROJECT_URN'] = 'urn:publicid+IDN+' + hostname + '+project+' + fields.get('PROJECT_NAME')
         fields['PROJECT_UID'] = str(uuid.uuid4())
@@ -4,6 +4,5 @@ import osliceauthorityexceptions
 from osliceauthorityresourcemanager import OSliceAuthorityResourceManager
 
 def setup():
-    sa_rm = OSliceAuthorityResourceManager()
-    pm.registerService('osliceauthorityrm', sa_rm)
+    pm.registerService('osliceauthorityrm', OSliceAuthorityResourceManager, lazy=True) # the constructor creates the database indexes
     pm.registerService('osliceauthorityexceptions', osliceauthorityexceptions)
\ No newline at end of file
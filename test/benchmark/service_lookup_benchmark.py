@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark for the per-request costs of looking up services and config items.
+
+Compares the lookups the resource managers used to do for each request (pm.getService and config.get, which queries the config
+database) with the service handles (pm.serviceHandle) and config.getCached. Besides the single operations, the lookups done by
+the Slice Authority for a 'get_version' and a 'create_slice' call are measured in both variants ('request_before' and
+'request_after').
+
+The config service is the real one (src/vendor/configdb) with a temporary SQLite database, so the pluginmanager needs
+deploy/config.json (see amsoil.config). No other plugins are loaded.
+    python test/benchmark/service_lookup_benchmark.py --output lookups.json
+"""
+import sys
+import os
+import os.path
+import json
+import optparse
+import tempfile
+import timeit
+
+ROOT_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_PATH, 'src'))
+sys.path.insert(0, os.path.join(ROOT_PATH, 'src', 'vendor', 'configdb'))
+
+def setup_services(db_path):
+    """Registers the config service (using the database at {db_path}) and a stand-in for apitools."""
+    import amsoil.config
+    amsoil.config.CONFIGDB_ENGINE = "sqlite:///%s" % (db_path,) # read by amconfigdb on import
+    import amsoil.core.pluginmanager as pm
+    import amconfigdb
+    pm.registerService('config', amconfigdb.ConfigDB())
+    pm.registerService('apitools', object())
+    config = pm.getService('config')
+    config.install('flask.hostname', 'localhost', "Hostname of Flask RPC server.")
+    config.install('flask.app_port', 8001, "Port to bind the Flask RPC to (standalone server).")
+    return pm
+
+def benchmarks(pm):
+    """Returns a list of (name, func) for the operations to measure."""
+    config_handle, api_tools_handle = pm.serviceHandle('config'), pm.serviceHandle('apitools')
+    config = pm.getService('config')
+
+    def request_before():
+        # urn(), api_versions() and create_slice() as they were: each looks up the services and reads the config database
+        pm.getService('config').get('flask.hostname')
+        c = pm.getService('config')
+        c.get('flask.hostname'), c.get('flask.app_port'), pm.getService('apitools')
+        pm.getService('config').get('flask.hostname')
+
+    def request_after():
+        config_handle.getCached('flask.hostname')
+        config_handle.getCached('flask.hostname'), config_handle.getCached('flask.app_port'), api_tools_handle()
+        config_handle.getCached('flask.hostname')
+
+    return [
+        ('getService', lambda: pm.getService('config')),
+        ('handle_call', config_handle),
+        ('handle_attribute', lambda: config_handle.get),
+        ('config_get', lambda: config.get('flask.hostname')),
+        ('config_get_cached', lambda: config.getCached('flask.hostname')),
+        ('request_before', request_before),
+        ('request_after', request_after)]
+
+def measure(func, number, repeat):
+    """Returns the fastest of {repeat} runs of {number} calls in microseconds per call."""
+    return min(timeit.Timer(func).repeat(repeat, number)) * 1000000.0 / number
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(usage="usage: %prog [options]")
+    parser.add_option("--number", type="int", default=2000, help="Calls per run. (defaults to 2000)")
+    parser.add_option("--repeat", type="int", default=5, help="Runs per operation, the fastest is reported. (defaults to 5)")
+    parser.add_option("--output", help="File to save the results to as JSON.")
+    opts, args = parser.parse_args()
+
+    db_file, db_path = tempfile.mkstemp(prefix='service-lookup-benchmark-', suffix='.db')
+    os.close(db_file)
+    try:
+        pm = setup_services(db_path)
+        operations = benchmarks(pm)
+        results = {}
+        for name, func in operations:
+            results[name] = measure(func, opts.number, opts.repeat)
+    finally:
+        os.remove(db_path)
+
+    print
+    print "%-20s %12s" % ('operation', 'us per call')
+    for name, _ in operations:
+        print "%-20s %12.2f" % (name, results[name])
+    print
+    print "Saved per request: %.2f us (%.1fx faster)" % (results['request_before'] - results['request_after'], results['request_before'] / results['request_after'])
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print "Saved the results to %s" % (opts.output,)
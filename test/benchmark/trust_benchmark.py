@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for the trust layer (src/vendor/geni_trust).
+
+Measures GID parsing, GID.verify_chain, Credential decoding, Credential.verify, geniutil.create_certificate and
+geniutil.create_credential for certificate chains of different depths (number of intermediate authorities between the trusted
+root and the user) and credentials of different delegation depths. The fixtures are generated in a temporary directory on start.
+
+Each operation is run --warmup times without measuring and then --repeat times. The minimum, median, mean, standard deviation,
+p95 and maximum are reported (and saved as JSON with --output).
+
+The signing and signature verification of credentials is done by xmlsec1. An alternative xmlsec1 compatible binary can be given
+via --xmlsec (it is passed on via the XMLSEC1 environment variable, see ext.sfa.trust.credential), so two engines can be compared:
+    python test/benchmark/trust_benchmark.py --output xmlsec1.json
+    python test/benchmark/trust_benchmark.py --xmlsec /opt/xmlsec-new/bin/xmlsec1 --compare xmlsec1.json
+"""
+import sys
+import os
+import os.path
+import json
+import math
+import optparse
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_PATH, 'src'))
+sys.path.insert(0, os.path.join(ROOT_PATH, 'src', 'vendor', 'geni_trust'))
+
+AUTHORITY = 'bench'
+EXPIRY = datetime.utcnow() + timedelta(days=1)
+
+class Fixtures(object):
+    """Generates the certificates and credentials in a temporary directory (see cleanup)."""
+
+    def __init__(self, chain_depths, delegation_depths):
+        import geniutil
+        self.path = tempfile.mkdtemp(prefix='trust-benchmark-')
+        self.root_cert, _, self.root_key = geniutil.create_certificate(geniutil.encode_urn(AUTHORITY, 'authority', 'sa'), is_ca=True)
+        self.root_cert_file = self.write('root-cert.pem', self.root_cert)
+
+        # user certificates below a chain of intermediate authorities: bench -> bench:l1 -> bench:l1:l2 -> ...
+        self.user_certs = {} # maps chain depth to the user's certificate (including the parents)
+        authority, issuer_cert, issuer_key = AUTHORITY, self.root_cert, self.root_key
+        for depth in range(max(chain_depths) + 1):
+            if depth in chain_depths:
+                self.user_certs[depth] = geniutil.create_certificate(geniutil.encode_urn(authority, 'user', 'alice'), issuer_key, issuer_cert)[0]
+            authority = "%s:l%i" % (authority, depth + 1)
+            issuer_cert, _, issuer_key = geniutil.create_certificate(geniutil.encode_urn(authority, 'authority', 'sa'), issuer_key, issuer_cert, is_ca=True)
+
+        # slice credential issued to user0 and delegated to user1, user2, ...
+        self.slice_cert = geniutil.create_slice_certificate(geniutil.encode_urn(AUTHORITY, 'slice', 'benchslice'), self.root_key, self.root_cert, EXPIRY)
+        users = []
+        for i in range(max(delegation_depths) + 1):
+            cert, _, key = geniutil.create_certificate(geniutil.encode_urn(AUTHORITY, 'user', 'user%i' % (i,)), self.root_key, self.root_cert)
+            users.append((self.write('user%i-cert.pem' % (i,), cert), self.write('user%i-key.pem' % (i,), key)))
+        self.user0_cert = open(users[0][0]).read()
+        self.credentials = {} # maps delegation depth to the credential's XML
+        import ext.sfa.trust.credential as sfa_cred
+        cred = sfa_cred.Credential(string=geniutil.create_credential(self.user0_cert, self.slice_cert, self.root_key, self.root_cert, 'slice', EXPIRY, delegatable=True))
+        for depth in range(max(delegation_depths) + 1):
+            if depth in delegation_depths:
+                self.credentials[depth] = cred.save_to_string()
+            if depth < max(delegation_depths):
+                (caller_cert_file, caller_key_file), (delegee_cert_file, _) = users[depth], users[depth + 1]
+                cred = cred.delegate(delegee_cert_file, caller_key_file, caller_cert_file)
+
+    def write(self, name, contents):
+        path = os.path.join(self.path, name)
+        with open(path, 'w') as f:
+            f.write(contents)
+        return path
+
+    def cleanup(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+def measure(func, setup=None, warmup=3, repeat=20):
+    """Calls {func}(state) {warmup} + {repeat} times; {state} is the result of calling {setup} before each call (not measured). Returns the statistics in seconds as dict."""
+    timings = []
+    for i in range(warmup + repeat):
+        state = setup() if setup else None
+        start = time.time()
+        func(state)
+        elapsed = time.time() - start
+        if i >= warmup:
+            timings.append(elapsed)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        'repeat' : len(timings),
+        'min' : timings[0],
+        'median' : _percentile(timings, 50),
+        'mean' : mean,
+        'stdev' : math.sqrt(sum((t - mean) ** 2 for t in timings) / len(timings)),
+        'p95' : _percentile(timings, 95),
+        'max' : timings[-1]}
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile."""
+    index = max(0, int(math.ceil(percent / 100.0 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+def benchmarks(fixtures):
+    """Returns a list of (name, func, setup) for the operations to measure."""
+    import geniutil
+    from ext.sfa.trust.gid import GID
+    import ext.sfa.trust.credential as sfa_cred
+    trusted = [GID(string=fixtures.root_cert)]
+    result = []
+    for depth, cert in sorted(fixtures.user_certs.iteritems()):
+        result.append(("gid_parse chain=%i" % (depth,), lambda s, cert=cert: GID(string=cert), None))
+        result.append(("gid_verify_chain chain=%i" % (depth,), lambda gid: gid.verify_chain(trusted), lambda cert=cert: GID(string=cert)))
+    for depth, xml in sorted(fixtures.credentials.iteritems()):
+        result.append(("credential_decode delegation=%i" % (depth,), lambda s, xml=xml: sfa_cred.Credential(string=xml), None))
+        result.append(("credential_verify delegation=%i" % (depth,), lambda cred: cred.verify([fixtures.root_cert_file]), lambda xml=xml: sfa_cred.Credential(string=xml)))
+    user_urn = geniutil.encode_urn(AUTHORITY, 'user', 'bob')
+    result.append(("create_certificate", lambda s: geniutil.create_certificate(user_urn, fixtures.root_key, fixtures.root_cert), None))
+    result.append(("create_credential", lambda s: geniutil.create_credential(fixtures.user0_cert, fixtures.slice_cert, fixtures.root_key, fixtures.root_cert, 'slice', EXPIRY), None))
+    return result
+
+def engine_description():
+    path = os.environ.get('XMLSEC1') or 'xmlsec1'
+    try:
+        version = subprocess.check_output([path, '--version'], stderr=subprocess.STDOUT).strip()
+    except (OSError, subprocess.CalledProcessError) as e:
+        version = "unknown (%s)" % (e,)
+    return {'path' : path, 'version' : version}
+
+def print_results(results, baseline=None):
+    print
+    print "%-34s %9s %9s %9s %9s %9s%s" % ('operation', 'min ms', 'median', 'mean', 'stdev', 'p95', '  vs. baseline' if baseline else '')
+    for name, r in sorted(results['operations'].iteritems()):
+        change = ""
+        b = baseline and baseline['operations'].get(name)
+        if b:
+            change = "  %+.1f%%" % ((r['median'] - b['median']) * 100.0 / b['median'],)
+        print "%-34s %9.2f %9.2f %9.2f %9.2f %9.2f%s" % (name, r['min'] * 1000, r['median'] * 1000, r['mean'] * 1000, r['stdev'] * 1000, r['p95'] * 1000, change)
+
+def _int_list(text):
+    return sorted(set(int(i) for i in text.split(',')))
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(usage="usage: %prog [options]")
+    parser.add_option("--chain-depths", default="0,1,2,4", help="Numbers of intermediate authorities between the root and the user. (defaults to 0,1,2,4)")
+    parser.add_option("--delegation-depths", default="0,1,2", help="Numbers of delegations of the credential. (defaults to 0,1,2)")
+    parser.add_option("--warmup", type="int", default=3, help="Unmeasured calls per operation. (defaults to 3)")
+    parser.add_option("--repeat", type="int", default=20, help="Measured calls per operation. (defaults to 20)")
+    parser.add_option("--filter", help="Only run the operations whose name contains the given text.")
+    parser.add_option("--xmlsec", help="Path of the xmlsec1 compatible binary to use. (defaults to xmlsec1 from the usual locations)")
+    parser.add_option("--output", help="File to save the results to as JSON.")
+    parser.add_option("--compare", help="JSON file of an earlier run to compare the medians with.")
+    opts, args = parser.parse_args()
+
+    if opts.xmlsec:
+        os.environ['XMLSEC1'] = os.path.abspath(os.path.expanduser(opts.xmlsec))
+    print "Generating the fixtures..."
+    fixtures = Fixtures(_int_list(opts.chain_depths), _int_list(opts.delegation_depths))
+    try:
+        operations = {}
+        for name, func, setup in benchmarks(fixtures):
+            if opts.filter and (opts.filter not in name):
+                continue
+            print "  %s" % (name,)
+            operations[name] = measure(func, setup, opts.warmup, opts.repeat)
+    finally:
+        fixtures.cleanup()
+
+    results = {
+        'operations' : operations,
+        'engine' : engine_description(),
+        'timestamp' : datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'settings' : {'chain_depths' : opts.chain_depths, 'delegation_depths' : opts.delegation_depths, 'warmup' : opts.warmup, 'repeat' : opts.repeat}}
+    baseline = None
+    if opts.compare:
+        with open(opts.compare, 'r') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print
+        print "Saved the results to %s" % (opts.output,)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+"""
+Load test for the v2 Slice Authority API (PROJECT objects).
+
+Runs a weighted mix of create/lookup/update/modify_membership/lookup_for_member calls with a fixed number of concurrent
+clients and reports the throughput and the p50/p95/p99 latencies per method. The results are saved as JSON, so they can be
+compared with the results of another commit (see --compare).
+
+Examples:
+    python test/benchmark/v2_benchmark.py --start-server --requests 2000 --output bench-HEAD.json
+    python test/benchmark/v2_benchmark.py --concurrency 16 --duration 60 --mix create=1,lookup=10 --compare bench-HEAD.json
+
+With --start-server the test credentials are generated (via test/creds/gen-certs.sh) if missing and src/main.py is started with
+a scratch MongoDB database (see OHOUSE_DB_NAME in amsoil.config), which is dropped afterwards. Otherwise an already running
+server is used (the benchmark creates projects named BENCH...).
+"""
+import sys
+import os
+import os.path
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+import optparse
+from datetime import datetime, timedelta
+
+ROOT_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_PATH, 'test', 'unit', 'v2'))
+
+from testtools import ssl_call, get_creds_file_contents
+
+METHODS = ['create', 'lookup', 'update', 'modify_membership', 'lookup_for_member']
+DEFAULT_MIX = 'create=1,lookup=5,update=2,modify_membership=1,lookup_for_member=3'
+MEMBER_URNS = ['urn:publicid:IDN+this.ma+user+bench%i' % (i,) for i in range(10)]
+PERCENTILES = [50, 95, 99]
+
+class Benchmark(object):
+    """Keeps the pool of created projects and the measured latencies (per method)."""
+
+    def __init__(self, mix, host, port, user_name='admin'):
+        self.mix = mix
+        self.host, self.port = host, port
+        self.user_name = user_name
+        self.credentials = [{"SFA" : get_creds_file_contents('%s-cred.xml' % (user_name,))}]
+        self.run_id = "%x" % (int(time.time() * 1000),)
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._project_urns = []
+        self.latencies = dict((method, []) for method in METHODS)
+        self.errors = dict((method, 0) for method in METHODS)
+
+    def call(self, method_name, params):
+        res = ssl_call(method_name, params, 'sa/2', key_path='%s-key.pem' % (self.user_name,), cert_path='%s-cert.pem' % (self.user_name,), host=self.host, port=self.port)
+        if res.get('code') != 0:
+            raise RuntimeError("%s returned %s: %s" % (method_name, res.get('code'), res.get('output')))
+        return res.get('value')
+
+    def create(self, rnd):
+        with self._lock:
+            self._counter += 1
+            name = "BENCH%s%i" % (self.run_id, self._counter)
+        expiration = (datetime.utcnow() + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        fields = {'PROJECT_EXPIRATION' : expiration, 'PROJECT_NAME' : name, 'PROJECT_DESCRIPTION' : 'Benchmark project'}
+        value = self.call('create', ['PROJECT', self.credentials, {'fields' : fields}])
+        with self._lock:
+            self._project_urns.append(value['PROJECT_URN'])
+
+    def lookup(self, rnd):
+        self.call('lookup', ['PROJECT', self.credentials, {'match' : {'PROJECT_URN' : self._any_project(rnd)}}])
+
+    def update(self, rnd):
+        self.call('update', ['PROJECT', self._any_project(rnd), self.credentials, {'fields' : {'PROJECT_DESCRIPTION' : 'Updated %i' % (rnd.randint(0, 1000000),)}}])
+
+    def modify_membership(self, rnd):
+        data = {'members_to_add' : [{'PROJECT_MEMBER' : rnd.choice(MEMBER_URNS), 'PROJECT_ROLE' : 'MEMBER'}]}
+        self.call('modify_membership', ['PROJECT', self._any_project(rnd), self.credentials, data])
+
+    def lookup_for_member(self, rnd):
+        self.call('lookup_for_member', ['PROJECT', rnd.choice(MEMBER_URNS), self.credentials, {}])
+
+    def _any_project(self, rnd):
+        with self._lock:
+            return rnd.choice(self._project_urns)
+
+    def warm_up(self, pool_size):
+        """Creates {pool_size} projects to work on (not measured)."""
+        rnd = random.Random(0)
+        for i in range(pool_size):
+            self.create(rnd)
+
+    def run(self, concurrency, requests=None, duration=None, seed=4711):
+        """Runs the mix with {concurrency} clients until {requests} calls were made or {duration} seconds passed. Returns the wall time."""
+        remaining = [requests]
+        deadline = (time.time() + duration) if duration else None
+        methods, weights = zip(*sorted(self.mix.iteritems()))
+
+        def client(rnd):
+            while True:
+                with self._lock:
+                    if remaining[0] is not None:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                if deadline and (time.time() >= deadline):
+                    return
+                method = _weighted_choice(rnd, methods, weights)
+                start = time.time()
+                try:
+                    getattr(self, method)(rnd)
+                    failed = False
+                except Exception as e:
+                    failed = True
+                elapsed = time.time() - start
+                with self._lock:
+                    if failed:
+                        self.errors[method] += 1
+                    else:
+                        self.latencies[method].append(elapsed)
+
+        threads = [threading.Thread(target=client, args=(random.Random(seed + i),)) for i in range(concurrency)]
+        start = time.time()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.time() - start
+
+    def results(self, wall_time):
+        """Returns the summary (see module description) as dict."""
+        def summary(latencies, errors):
+            latencies = sorted(latencies)
+            result = {'count' : len(latencies), 'errors' : errors, 'throughput' : len(latencies) / wall_time if wall_time else 0.0}
+            if latencies:
+                result['mean'] = sum(latencies) / len(latencies)
+                result['max'] = latencies[-1]
+                for p in PERCENTILES:
+                    result['p%i' % (p,)] = _percentile(latencies, p)
+            return result
+        methods = dict((m, summary(self.latencies[m], self.errors[m])) for m in METHODS if self.latencies[m] or self.errors[m])
+        total = summary([l for m in METHODS for l in self.latencies[m]], sum(self.errors.values()))
+        return {'methods' : methods, 'total' : total, 'wall_time' : wall_time}
+
+def _weighted_choice(rnd, items, weights):
+    point = rnd.uniform(0, sum(weights))
+    for item, weight in zip(items, weights):
+        point -= weight
+        if point <= 0:
+            return item
+    return items[-1]
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile."""
+    index = max(0, int(math.ceil(percent / 100.0 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        method, weight = part.split('=')
+        if method not in METHODS:
+            raise ValueError("Unknown method in the mix: %s (known: %s)" % (method, ", ".join(METHODS)))
+        mix[method] = float(weight)
+    return dict((m, w) for m, w in mix.iteritems() if w > 0)
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT_PATH).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# --- server handling
+
+def ensure_creds(user_name):
+    if not os.path.isfile(os.path.join(ROOT_PATH, 'test', 'creds', '%s-cred.xml' % (user_name,))):
+        print "Generating the test credentials..."
+        subprocess.check_call(['sh', 'test/creds/gen-certs.sh'], cwd=ROOT_PATH)
+
+def start_server(host, port, db_name):
+    env = dict(os.environ)
+    env['OHOUSE_DB_NAME'] = db_name
+    log = open(os.path.join(ROOT_PATH, 'log', 'benchmark-server.log'), 'a')
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT_PATH, 'src', 'main.py')], cwd=ROOT_PATH, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("The server exited (see log/benchmark-server.log)")
+        try:
+            ssl_call('get_version', [], 'sa/2', key_path='admin-key.pem', cert_path='admin-cert.pem', host=host, port=port)
+            return server
+        except Exception:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("The server did not answer within 60 seconds (see log/benchmark-server.log)")
+
+def drop_database(db_name):
+    try:
+        import pymongo
+        sys.path.insert(0, os.path.join(ROOT_PATH, 'src'))
+        from amsoil.config import db_ip, db_port
+        pymongo.MongoClient(db_ip, db_port).drop_database(db_name)
+    except Exception as e:
+        print "Could not drop the scratch database %s (%s)" % (db_name, e)
+
+# --- reporting
+
+def print_results(results):
+    print
+    print "%-18s %8s %7s %10s %9s %9s %9s" % ('method', 'calls', 'errors', 'calls/s', 'p50 ms', 'p95 ms', 'p99 ms')
+    rows = sorted(results['methods'].iteritems()) + [('TOTAL', results['total'])]
+    for method, r in rows:
+        print "%-18s %8i %7i %10.1f %9s %9s %9s" % ((method, r['count'], r['errors'], r['throughput']) + tuple(_ms(r.get('p%i' % (p,))) for p in PERCENTILES))
+
+def print_comparison(results, baseline):
+    print
+    print "Compared to %s (commit %s):" % (baseline.get('timestamp'), baseline.get('commit'))
+    rows = sorted(results['methods'].iteritems()) + [('TOTAL', results['total'])]
+    for method, r in rows:
+        b = baseline['total'] if method == 'TOTAL' else baseline['methods'].get(method)
+        if not b:
+            continue
+        changes = ["calls/s %s" % (_change(r['throughput'], b['throughput']),)] + ["p%i %s" % (p, _change(r.get('p%i' % (p,)), b.get('p%i' % (p,)))) for p in PERCENTILES]
+        print "%-18s %s" % (method, "  ".join(changes))
+
+def _ms(seconds):
+    return "-" if seconds is None else "%.1f" % (seconds * 1000,)
+
+def _change(value, base):
+    if not value or not base:
+        return "n/a"
+    return "%+.1f%%" % ((value - base) * 100.0 / base,)
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(usage="usage: %prog [options]")
+    parser.add_option("--host", default="127.0.0.1")
+    parser.add_option("--port", type="int", default=8001)
+    parser.add_option("--concurrency", type="int", default=8, help="Number of concurrent clients. (defaults to 8)")
+    parser.add_option("--requests", type="int", default=None, help="Total number of calls. (defaults to 1000, unless --duration is given)")
+    parser.add_option("--duration", type="float", default=None, help="Seconds to run instead of a number of calls.")
+    parser.add_option("--mix", default=DEFAULT_MIX, help="Weights of the methods. (defaults to %s)" % (DEFAULT_MIX,))
+    parser.add_option("--pool", type="int", default=20, help="Number of projects created before measuring. (defaults to 20)")
+    parser.add_option("--seed", type="int", default=4711)
+    parser.add_option("--user", default="admin", help="Test user whose certificate and credential are used. (defaults to admin)")
+    parser.add_option("--start-server", action="store_true", help="Starts src/main.py with a scratch database for the benchmark.")
+    parser.add_option("--output", help="File to save the results to as JSON.")
+    parser.add_option("--compare", help="JSON file of an earlier run to compare the results with.")
+    opts, args = parser.parse_args()
+    if (opts.requests is None) and (opts.duration is None):
+        opts.requests = 1000
+
+    mix = parse_mix(opts.mix)
+    server, db_name = None, None
+    if opts.start_server:
+        ensure_creds(opts.user)
+        db_name = "ohouse_benchmark_%i" % (os.getpid(),)
+        server = start_server(opts.host, opts.port, db_name)
+    try:
+        benchmark = Benchmark(mix, opts.host, opts.port, opts.user)
+        benchmark.warm_up(max(opts.pool, 1))
+        wall_time = benchmark.run(opts.concurrency, opts.requests, opts.duration, opts.seed)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+            drop_database(db_name)
+
+    results = benchmark.results(wall_time)
+    results.update({
+        'commit' : git_commit(),
+        'timestamp' : datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'settings' : {'concurrency' : opts.concurrency, 'requests' : opts.requests, 'duration' : opts.duration, 'mix' : mix, 'pool' : opts.pool, 'seed' : opts.seed}})
+    print_results(results)
+    if opts.compare:
+        with open(opts.compare, 'r') as f:
+            print_comparison(results, json.load(f))
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print
+        print "Saved the results to %s" % (opts.output,)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+import unittest
+import os.path
+import sys
+import json
+import logging
+import Queue
+
+# amsoil.core.log reads the config, so it needs deploy/config.json (see amsoil.config); the tests use their own handlers
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src'))
+
+from amsoil.core import log
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+        self.records = []
+    def emit(self, record):
+        self.records.append(record)
+
+def make_record(msg, args=None, level=logging.INFO, exc_info=None):
+    return logging.LogRecord(log.LOGGER_NAME, level, __file__, 1, msg, args, exc_info)
+
+def raise_error():
+    try:
+        raise ValueError("broken")
+    except ValueError:
+        return sys.exc_info()
+
+class TestTruncate(unittest.TestCase):
+
+    def test_truncate(self):
+        self.assertEqual(log.truncate("abcdef", 10), "abcdef")
+        self.assertEqual(log.truncate("abcdef", 6), "abcdef")
+        self.assertEqual(log.truncate("abcdef", 2), "ab... [truncated 4 of 6 characters]")
+        self.assertEqual(log.truncate("abcdef", 0), "abcdef")
+        self.assertEqual(log.truncate("abcdef", None), "abcdef")
+        self.assertEqual(log.truncate(None, 2), None)
+
+class TestRecordPreparingFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.filter = log.RecordPreparingFilter(20)
+
+    def tearDown(self):
+        log.set_request_id(None)
+
+    def test_merges_and_truncates(self):
+        log.set_request_id('abc')
+        record = make_record("value %s and %s", ('x' * 10, 'y' * 10))
+        self.assertTrue(self.filter.filter(record))
+        self.assertEqual(record.msg, "value xxxxxxxxxx and... [truncated 11 of 31 characters]")
+        self.assertEqual(record.args, None)
+        self.assertEqual(record.request_id, 'abc')
+
+    def test_renders_exception(self):
+        record = make_record("failed", exc_info=raise_error())
+        self.filter.filter(record)
+        self.assertEqual(record.exc_info, None)
+        self.assertIn("ValueError: broken", record.exc_text)
+
+    def test_bad_arguments(self):
+        record = make_record("%s and %s", ('only one',))
+        self.assertTrue(log.RecordPreparingFilter(0).filter(record)) # does not raise
+        self.assertEqual(record.msg, "'%s and %s' (arguments: ('only one',))")
+        self.assertEqual(record.args, None)
+
+class TestQueue(unittest.TestCase):
+
+    def test_listener_writes_records(self):
+        handler = log.QueueHandler(Queue.Queue(10))
+        target, warnings_only = ListHandler(), ListHandler(logging.WARNING)
+        listener = log.QueueListener(handler.queue, [target, warnings_only], handler)
+        listener.start()
+        handler.handle(make_record("first"))
+        handler.handle(make_record("second", level=logging.ERROR))
+        listener.stop()
+        self.assertEqual([r.msg for r in target.records], ["first", "second"])
+        self.assertEqual([r.msg for r in warnings_only.records], ["second"])
+
+    def test_full_queue_drops_and_reports(self):
+        handler = log.QueueHandler(Queue.Queue(2))
+        for i in range(5):
+            handler.handle(make_record("record %i" % (i,)))
+        self.assertEqual(handler.dropped, 3)
+        target = ListHandler()
+        listener = log.QueueListener(handler.queue, [target], handler)
+        listener.start()
+        listener.stop()
+        self.assertEqual([r.msg for r in target.records][:1], ["record 0"])
+        self.assertIn("Dropped 3 log records", target.records[1].msg)
+        self.assertEqual(target.records[2].msg, "record 1")
+
+    def test_forked_child_writes_directly(self):
+        target = ListHandler()
+        handler = log.QueueHandler(Queue.Queue(10), [target])
+        handler._pid = -1 # as if the handler was created by the parent process
+        handler.handle(make_record("in child"))
+        self.assertTrue(handler.queue.empty())
+        self.assertEqual([r.msg for r in target.records], ["in child"])
+
+class TestJSONFormatter(unittest.TestCase):
+
+    def test_format(self):
+        record = make_record("[plugin] message %i", (1,), level=logging.WARNING, exc_info=raise_error())
+        record.prefix, record.request_id = 'plugin', 'abc'
+        entry = json.loads(log.JSONFormatter().format(record))
+        self.assertEqual(entry['message'], "message 1")
+        self.assertEqual(entry['prefix'], 'plugin')
+        self.assertEqual(entry['request_id'], 'abc')
+        self.assertEqual(entry['level'], 'WARNING')
+        self.assertIn("ValueError: broken", entry['exception'])
+        self.assertNotIn("\n", log.JSONFormatter().format(record))
+
+    def test_format_without_extras(self):
+        entry = json.loads(log.JSONFormatter().format(make_record("plain")))
+        self.assertEqual((entry['message'], entry['prefix'], entry['request_id']), ("plain", None, None))
+        self.assertNotIn('exception', entry)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0, exit=True)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+import unittest
+import os.path
+import sys
+import json
+import shutil
+import tempfile
+
+# the pluginmanager needs deploy/config.json (see amsoil.config), but no plugins are loaded
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src'))
+
+import amsoil.core.pluginmanager as pm
+
+class FakePlugin(object):
+    """Has the attributes of PluginInfo which are used for resolving the load order."""
+    def __init__(self, name, implements, loads_after):
+        self.pluginName = name
+        self.serviceNames = set(implements)
+        self.loadsAfter = loads_after
+
+def names(plugins):
+    return [p.pluginName for p in plugins]
+
+class TestLoadOrder(unittest.TestCase):
+
+    def test_dependencies_first(self):
+        plugins = [FakePlugin('ofed', [], ['apitools', 'config']), FakePlugin('fedtools', ['apitools'], ['mongodb', 'config']),
+                   FakePlugin('configdb', ['config'], []), FakePlugin('mongodb', ['mongodb'], [])]
+        self.assertEqual(names(pm.load_order(plugins)), ['configdb', 'mongodb', 'fedtools', 'ofed'])
+
+    def test_independent_plugins_keep_order(self):
+        plugins = [FakePlugin(n, [n], []) for n in 'dcba']
+        self.assertEqual(names(pm.load_order(plugins)), list('dcba'))
+
+    def test_cycle(self):
+        plugins = [FakePlugin('free', ['free'], []), FakePlugin('a', ['a'], ['b']), FakePlugin('b', ['b'], ['c']), FakePlugin('c', ['c'], ['a', 'free'])]
+        with self.assertRaises(pm.PluginLoadAfterResolvingError) as context:
+            pm.load_order(plugins)
+        self.assertIn('a -> b -> c -> a', str(context.exception))
+
+    def test_missing_service(self):
+        with self.assertRaises(pm.PluginLoadAfterResolvingError) as context:
+            pm.load_order([FakePlugin('a', ['a'], ['nothing'])])
+        self.assertIn('nothing', str(context.exception))
+
+    def test_duplicate_service(self):
+        self.assertRaises(pm.PluginDuplicateServiceDefinitionsInManifestError, pm.load_order, [FakePlugin('a', ['s'], []), FakePlugin('b', ['s'], [])])
+
+PLUGIN_SOURCE = """
+import amsoil.core.pluginmanager as pm
+CALLS = []
+def setup():
+    CALLS.append('setup')
+    for name in %r:
+        pm.registerService(name, lambda name=name: CALLS.append(name) or {'service' : name}, lazy=True)
+"""
+
+class TestPartialAndLazySetup(unittest.TestCase):
+    """Sets up the plugins base <- needed and other <- (requires) needed in a temporary folder, but only asks for the service 'needed' in init."""
+
+    @classmethod
+    def setUpClass(klass):
+        klass.path = tempfile.mkdtemp()
+        for name, implements, loads_after, requires in [('base', ['base'], [], []), ('needed', ['needed'], ['base'], ['other']), ('other', ['other'], ['base'], [])]:
+            os.mkdir(os.path.join(klass.path, name))
+            with open(os.path.join(klass.path, name, 'MANIFEST.json'), 'w') as f:
+                json.dump({'implements' : implements, 'loads-after' : loads_after, 'requires' : requires}, f)
+            with open(os.path.join(klass.path, name, 'plugin.py'), 'w') as f:
+                f.write(PLUGIN_SOURCE % (implements,))
+        pm.init(klass.path, services=['needed'])
+
+    @classmethod
+    def tearDownClass(klass):
+        shutil.rmtree(klass.path)
+
+    def calls(self, plugin_name):
+        return sys.modules[plugin_name].CALLS
+
+    def test_setup_on_demand_and_lazy_instantiation(self):
+        self.assertEqual(self.calls('base'), ['setup'])
+        self.assertEqual(self.calls('needed'), ['setup'])
+        self.assertNotIn('other', sys.modules) # not needed for 'needed' (only required)
+        self.assertEqual(pm.getService('needed'), {'service' : 'needed'})
+        self.assertEqual(pm.getService('needed'), {'service' : 'needed'})
+        self.assertEqual(self.calls('needed'), ['setup', 'needed']) # the factory is called once
+        self.assertEqual(pm.getService('other'), {'service' : 'other'})
+        self.assertEqual(self.calls('other'), ['setup', 'other'])
+        self.assertEqual(self.calls('base'), ['setup']) # not set up again
+        self.assertRaises(pm.ServiceNotRegisteredError, pm.getService, 'unknown')
+
+class TestServiceHandle(unittest.TestCase):
+
+    def test_resolved_on_first_use(self):
+        handle = pm.serviceHandle('handle_early')
+        self.assertIs(pm.serviceHandle('handle_early'), handle)
+        self.assertRaises(pm.ServiceNotRegisteredError, handle)
+        pm.registerService('handle_early', {'key' : 'value'})
+        self.assertEqual(handle(), {'key' : 'value'})
+        self.assertEqual(handle.get('key'), 'value') # forwarded to the service
+
+    def test_lazy_service(self):
+        calls = []
+        handle = pm.serviceHandle('handle_lazy')
+        pm.registerService('handle_lazy', lambda: calls.append(1) or set(['instance']), lazy=True)
+        self.assertEqual(handle(), set(['instance']))
+        self.assertIs(handle(), pm.getService('handle_lazy'))
+        self.assertEqual(len(calls), 1)
+
+    def test_valid_across_registry_changes(self):
+        pm.registerService('handle_stable', ['first'])
+        handle = pm.serviceHandle('handle_stable')
+        self.assertEqual(handle(), ['first'])
+        pm.registerService('handle_other', None)
+        self.assertEqual(handle(), ['first'])
+        pm._service_registry['handle_stable'] = ['replaced'] # as done when a lazy service is instantiated
+        pm._registry_generation[0] += 1
+        self.assertEqual(handle(), ['replaced'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0, exit=True)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+import unittest
+import os.path
+import sys
+import json
+import shutil
+import tempfile
+import threading
+
+# the tracing has no dependencies besides the standard library (amsoil's __init__ does not load the config)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src'))
+
+from amsoil.core import trace
+
+class Log(object):
+    def __init__(self):
+        self.warnings = []
+    def warning(self, message):
+        self.warnings.append(message)
+
+@trace.traced('decorated')
+def decorated(value):
+    with trace.span('inner'):
+        return value * 2
+
+def names(span):
+    return (span.name, [names(c) for c in span.children])
+
+class TestSpans(unittest.TestCase):
+
+    def tearDown(self):
+        trace.finish_trace()
+
+    def test_nesting(self):
+        root = trace.start_trace('request')
+        with trace.span('a'):
+            with trace.span('b'):
+                pass
+            self.assertEqual(decorated(2), 4)
+        with trace.span('a'):
+            pass
+        self.assertIs(trace.finish_trace(), root)
+        self.assertEqual(names(root), ('request', [('a', [('b', []), ('decorated', [('inner', [])])]), ('a', [])]))
+        self.assertTrue(all(s.end is not None for s in root.children))
+        self.assertTrue(root.duration >= root.children[0].duration)
+        self.assertTrue(root.self_time <= root.duration)
+        self.assertEqual(trace.finish_trace(), None) # already finished
+
+    def test_no_trace(self):
+        with trace.span('ignored') as s:
+            self.assertEqual(s, None)
+        self.assertEqual(decorated(3), 6)
+        self.assertEqual(trace.finish_trace(), None)
+
+    def test_exception_closes_span(self):
+        root = trace.start_trace('request')
+        try:
+            with trace.span('failing'):
+                raise ValueError()
+        except ValueError:
+            pass
+        with trace.span('next'):
+            pass
+        trace.finish_trace()
+        self.assertEqual(names(root), ('request', [('failing', []), ('next', [])]))
+
+    def test_thread_local(self):
+        root = trace.start_trace('request')
+        other = []
+        def run():
+            with trace.span('other thread'):
+                pass
+            other.append(trace.finish_trace())
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        with trace.span('this thread'):
+            pass
+        trace.finish_trace()
+        self.assertEqual(other, [None])
+        self.assertEqual(names(root), ('request', [('this thread', [])]))
+
+    def test_format_combines_siblings(self):
+        root = trace.start_trace('request')
+        for i in range(3):
+            with trace.span('mongodb.lookup'):
+                pass
+        trace.finish_trace()
+        lines = trace.format_trace(root).splitlines()
+        self.assertTrue(lines[0].startswith('request  '))
+        self.assertTrue(lines[1].startswith('  mongodb.lookup x3  '))
+        self.assertEqual(trace.trace_to_dict(root)['children'][0]['name'], 'mongodb.lookup')
+
+class TestSlowTraceWriter(unittest.TestCase):
+
+    def finished_trace(self, seconds):
+        root = trace.start_trace('request')
+        with trace.span('a'):
+            pass
+        trace.finish_trace()
+        root.end = root.start + seconds
+        return root
+
+    def test_threshold_log(self):
+        log = Log()
+        writer = trace.SlowTraceWriter(1.0, log)
+        self.assertFalse(writer.emit(self.finished_trace(0.5)))
+        self.assertFalse(writer.emit(None))
+        self.assertEqual(log.warnings, [])
+        self.assertTrue(writer.emit(self.finished_trace(1.5)))
+        self.assertEqual(len(log.warnings), 1)
+        self.assertIn("Slow request (1.500s)", log.warnings[0])
+        self.assertIn("\n  a  ", log.warnings[0])
+
+    def test_file(self):
+        path = tempfile.mkdtemp()
+        try:
+            log = Log()
+            trace_file = os.path.join(path, 'traces.json')
+            writer = trace.SlowTraceWriter(1.0, log, trace_file)
+            writer.emit(self.finished_trace(2.0))
+            writer.emit(self.finished_trace(0.1))
+            writer.emit(self.finished_trace(3.0))
+            with open(trace_file) as f:
+                entries = [json.loads(line) for line in f]
+            self.assertEqual([round(e['duration'], 6) for e in entries], [2.0, 3.0])
+            self.assertEqual(entries[0]['children'][0]['name'], 'a')
+            self.assertFalse(trace.SlowTraceWriter(1.0, log, os.path.join(path, 'missing', 'traces.json')).emit(self.finished_trace(2.0)))
+            self.assertEqual(len(log.warnings), 1) # could not write
+        finally:
+            shutil.rmtree(path)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0, exit=True)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import unittest
+import os.path
+import sys
+import threading
+import time
+
+# the profiler has no dependencies, so it can be imported without starting the server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src', 'vendor', 'configrpc', 'crpc'))
+
+from profiler import SamplingProfiler, ProfilerBusy
+
+def busy_waiting(stop):
+    while not stop.is_set():
+        sum(xrange(1000))
+
+class TestSamplingProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.stop = threading.Event()
+        self.worker = threading.Thread(target=busy_waiting, args=(self.stop,))
+        self.worker.start()
+
+    def tearDown(self):
+        self.stop.set()
+        self.worker.join()
+
+    def test_samples_other_threads(self):
+        profiler = SamplingProfiler(0.001)
+        profiler.run(0.2)
+        self.assertTrue(profiler.samples > 0)
+        lines = profiler.collapsed().splitlines()
+        self.assertTrue(any('busy_waiting' in line for line in lines))
+        for line in lines: # "frame;frame;... count"
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(int(count) > 0)
+            self.assertFalse('test_samples_other_threads' in stack) # the calling thread is not sampled
+        self.assertEqual(sum(samples for frame, samples in profiler.top(1000)), sum(int(line.rsplit(' ', 1)[1]) for line in lines))
+
+    def test_one_profile_at_a_time(self):
+        first = threading.Thread(target=SamplingProfiler(0.001).run, args=(0.3,))
+        first.start()
+        time.sleep(0.05)
+        self.assertRaises(ProfilerBusy, SamplingProfiler().run, 0.1)
+        first.join()
+        SamplingProfiler().run(0.01) # free again
+
+    def test_start_in_background(self):
+        profiler = SamplingProfiler(0.001)
+        start = time.time()
+        profiler.start(0.2)
+        self.assertTrue(time.time() - start < 0.1) # does not block
+        self.assertFalse(profiler.done.is_set())
+        self.assertRaises(ProfilerBusy, SamplingProfiler().start, 0.1)
+        self.assertTrue(profiler.done.wait(5))
+        self.assertTrue(profiler.samples > 0)
+        self.assertTrue('busy_waiting' in profiler.collapsed())
+        self.assertTrue('_sample_for' not in profiler.collapsed()) # the sampling thread is not sampled
+        SamplingProfiler().run(0.01) # free again
+
+    def test_interval_range(self):
+        for interval in [0, 0.0001, 1.5, -1]:
+            self.assertRaises(ValueError, SamplingProfiler, interval)
+        SamplingProfiler(SamplingProfiler.MIN_INTERVAL), SamplingProfiler(SamplingProfiler.MAX_INTERVAL)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0, exit=True)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+import unittest
+import random
+import os.path
+import sys
+
+# the query engine has no dependencies, so it can be imported without starting the server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src', 'plugins', 'fedtools'))
+
+from queryengine import compile_query, match_and_filter, IndexedRows
+
+RUNS = 2000
+SEED = 4711
+FIELDS = ['A', 'B', 'C', 'D']
+VALUES = ['x', u'x', 'y', 1, 2, True, 1.0, None, [1], {'k' : 1}]
+
+def reference_match_and_filter(list_of_dicts, field_filter, field_match):
+    """The implementation the query engine replaces (nested loops)."""
+    def filter_fields(d):
+        if not field_filter:
+            return d
+        result = {}
+        for f in field_filter:
+            result[f] = d[f]
+        return result
+    def does_match_fields(d):
+        if not field_match:
+            return True
+        for mk, mv in field_match.iteritems():
+            val = d[mk]
+            if isinstance(mv, list):
+                found_any = False
+                for mvv in mv:
+                    if val == mvv:
+                        found_any = True
+                if not found_any:
+                    return False
+            else:
+                if not val == mv:
+                    return False
+        return True
+    return [filter_fields(d) for d in list_of_dicts if does_match_fields(d)]
+
+def outcome(func, *args):
+    """Returns the result of the call or the type of the raised exception."""
+    try:
+        return func(*args)
+    except Exception as e:
+        return type(e)
+
+class TestQueryEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.rnd = random.Random(SEED)
+
+    def random_rows(self):
+        rows = []
+        for _ in range(self.rnd.randint(0, 8)):
+            fields = [f for f in FIELDS if self.rnd.random() < 0.9] # some rows lack fields
+            rows.append(dict((f, self.rnd.choice(VALUES[:7] if self.rnd.random() < 0.9 else VALUES)) for f in fields))
+        return rows
+
+    def random_spec(self):
+        match = {}
+        for f in self.rnd.sample(FIELDS, self.rnd.randint(0, 2)):
+            if self.rnd.random() < 0.5:
+                match[f] = self.rnd.sample(VALUES, self.rnd.randint(0, 3))
+            else:
+                match[f] = self.rnd.choice(VALUES)
+        field_filter = self.rnd.sample(FIELDS, self.rnd.randint(0, 2)) if self.rnd.random() < 0.7 else None
+        return match, field_filter
+
+    def test_equals_reference(self):
+        for _ in range(RUNS):
+            rows = self.random_rows()
+            match, field_filter = self.random_spec()
+            expected = outcome(reference_match_and_filter, rows, field_filter, match)
+            self.assertEqual(outcome(match_and_filter, rows, field_filter, match), expected, (rows, field_filter, match))
+            self.assertEqual(outcome(match_and_filter, IndexedRows(rows), field_filter, match), expected, (rows, field_filter, match))
+
+    def test_indexed_rows_are_reusable(self):
+        indexed = IndexedRows([{'A' : 'x', 'B' : 1}, {'A' : 'y', 'B' : 2}, {'A' : 'x', 'B' : 3}])
+        self.assertEqual(compile_query({'A' : 'x'}, ['B']).apply(indexed), [{'B' : 1}, {'B' : 3}])
+        self.assertEqual(compile_query({'A' : ['y', 'x'], 'B' : [2, 3]}, ['B']).apply(indexed), [{'B' : 2}, {'B' : 3}])
+        self.assertEqual(compile_query({}, None).apply(indexed), list(indexed.rows))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0, exit=True)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+import unittest
+import os.path
+import sys
+
+# the metrics have no dependencies, so they can be imported without starting the server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src', 'vendor', 'flaskrpcs'))
+
+import metrics
+
+class Marshalled(object):
+    """Has the attributes of flaskxmlrpc.MarshalledResponse (which needs flask)."""
+    def __init__(self, code):
+        self.data, self.code = '<methodResponse/>', code
+
+class TestResultCode(unittest.TestCase):
+
+    def test_codes(self):
+        self.assertEqual(metrics.result_code({'code' : 0, 'value' : 1, 'output' : None}), '0')
+        self.assertEqual(metrics.result_code({'code' : {'geni_code' : 7}, 'value' : None}), '7')
+        self.assertEqual(metrics.result_code({'code' : {}}), 'unknown')
+        self.assertEqual(metrics.result_code(Marshalled('0')), '0')
+        self.assertEqual(metrics.result_code([1, 2]), 'unknown')
+        self.assertEqual(metrics.result_code(None), 'unknown')
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = metrics.Metrics()
+
+    def call(self, seconds, code='0', endpoint='/sa/2', method='lookup'):
+        self.metrics.started(endpoint, method)
+        self.metrics.finished(endpoint, method, seconds, code)
+
+    def test_buckets(self):
+        for seconds in [0.001, 0.005, 0.007, 0.3, 100.0]:
+            self.call(seconds)
+        latency = self.metrics.snapshot()['latency'][('/sa/2', 'lookup')]
+        buckets = dict(latency['buckets'])
+        self.assertEqual(buckets[0.005], 2) # the upper bound is inclusive
+        self.assertEqual(buckets[0.01], 3)
+        self.assertEqual(buckets[0.25], 3)
+        self.assertEqual(buckets[0.5], 4) # cumulative
+        self.assertEqual(buckets[30.0], 4)
+        self.assertEqual(buckets[float('inf')], 5)
+        self.assertEqual(latency['count'], 5)
+        self.assertAlmostEqual(latency['sum'], 100.313)
+
+    def test_codes_and_in_flight(self):
+        self.call(0.1, '0')
+        self.call(0.1, '0')
+        self.call(0.1, 'exception')
+        self.call(0.1, '0', method='create')
+        self.metrics.started('/sa/2', 'lookup')
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['calls'], {('/sa/2', 'lookup', '0') : 2, ('/sa/2', 'lookup', 'exception') : 1, ('/sa/2', 'create', '0') : 1})
+        self.assertEqual(snapshot['in_flight'], {('/sa/2', 'lookup') : 1, ('/sa/2', 'create') : 0})
+        self.metrics.finished('/sa/2', 'lookup', 0.1, '0')
+        self.assertEqual(self.metrics.snapshot()['in_flight'][('/sa/2', 'lookup')], 0)
+
+    def test_prometheus_text(self):
+        self.call(0.02, '0', endpoint='/reg/"2"')
+        lines = self.metrics.prometheus_text().splitlines()
+        labels = 'endpoint="/reg/\\"2\\"",method="lookup"'
+        self.assertIn("# TYPE xmlrpc_request_duration_seconds histogram", lines)
+        self.assertIn('xmlrpc_request_duration_seconds_bucket{%s,le="0.01"} 0' % (labels,), lines)
+        self.assertIn('xmlrpc_request_duration_seconds_bucket{%s,le="0.025"} 1' % (labels,), lines)
+        self.assertIn('xmlrpc_request_duration_seconds_bucket{%s,le="+Inf"} 1' % (labels,), lines)
+        self.assertIn('xmlrpc_request_duration_seconds_sum{%s} 0.02' % (labels,), lines)
+        self.assertIn('xmlrpc_request_duration_seconds_count{%s} 1' % (labels,), lines)
+        self.assertIn('xmlrpc_requests_total{code="0",endpoint="/reg/\\"2\\"",method="lookup"} 1', lines)
+        self.assertIn('xmlrpc_requests_in_flight{%s} 0' % (labels,), lines)
+        self.assertTrue(self.metrics.prometheus_text().endswith("\n"))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0, exit=True)
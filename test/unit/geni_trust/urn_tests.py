@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+import unittest
+import random
+import os.path
+import sys
+
+# make the geni_trust plugin importable without starting the server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src', 'vendor', 'geni_trust'))
+
+from ext.geni.util.urn_util import URN
+import urncodec
+
+ALPHABET = "abcXYZ019.-_%;+ #?':/|\t" #: includes all characters which are escaped (or rejected) by urn_util
+URN_TOKENS = list("abcXYZ019.-_%;:'") + ['%25', '%3B', '%2B', '%23', '%3F', '%27', '%3A', '%2F', '::', '//'] #: escaped sequences as they appear in URNs
+RUNS = 2000
+SEED = 4711
+
+def random_part(rnd):
+    """Returns a random string with characters which are likely to make trouble."""
+    return ''.join(rnd.choice(ALPHABET) for _ in range(rnd.randint(0, 12)))
+
+def random_urn_part(rnd):
+    """Returns a random URN part, which contains an invalid character every now and then."""
+    if rnd.random() < 0.1:
+        return random_part(rnd)
+    return ''.join(rnd.choice(URN_TOKENS) for _ in range(rnd.randint(0, 8)))
+
+def random_urn(rnd):
+    """Returns random, mostly valid-looking URN strings (varying number of '+' separated parts)."""
+    prefix = rnd.choice(['urn:publicid:IDN', 'urn:publicid:IDN', 'urn:publicid:IDN', 'urn:publicid:', 'urn:foo:IDN', ''])
+    return '+'.join([prefix] + [random_urn_part(rnd) for _ in range(rnd.randint(0, 5))])
+
+def outcome(func, *args):
+    """Returns the result of the call or the type of the raised exception."""
+    try:
+        return func(*args)
+    except Exception as e:
+        return type(e)
+
+def reference_decode(urn):
+    urn = URN(urn=str(urn))
+    return urn.getAuthority(), urn.getType(), urn.getName()
+
+def reference_encode(authority, typ, name):
+    return URN(authority=authority, type=typ, name=name).urn_string()
+
+class TestURNCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.rnd = random.Random(SEED)
+        urncodec._decode_cache.clear()
+        urncodec._encode_cache.clear()
+
+    def test_decode_equals_urn_util(self):
+        for _ in range(RUNS):
+            urn = random_urn(self.rnd)
+            expected = outcome(reference_decode, urn)
+            self.assertEqual(outcome(urncodec.decode, urn), expected, urn)
+            self.assertEqual(outcome(urncodec.decode, urn), expected, urn) # again, now from the cache
+
+    def test_encode_equals_urn_util(self):
+        for _ in range(RUNS):
+            args = (random_part(self.rnd), random_part(self.rnd), random_part(self.rnd))
+            expected = outcome(reference_encode, *args)
+            self.assertEqual(outcome(urncodec.encode, *args), expected, args)
+            self.assertEqual(outcome(urncodec.encode, *args), expected, args) # again, now from the cache
+
+    def test_roundtrip_equals_urn_util(self):
+        for _ in range(RUNS):
+            args = (random_part(self.rnd), random_part(self.rnd), random_part(self.rnd))
+            urn = outcome(urncodec.encode, *args)
+            if isinstance(urn, str):
+                self.assertEqual(urncodec.decode(urn), reference_decode(urn))
+
+    def test_unicode(self):
+        self.assertEqual(urncodec.decode(u'urn:publicid:IDN+eict.de+user+motine'), ('eict.de', 'user', 'motine'))
+        self.assertEqual(outcome(urncodec.encode, u'eict.de', 'user', 'motine'), outcome(reference_encode, u'eict.de', 'user', 'motine'))
+
+    def test_cache_is_bounded(self):
+        for i in range(urncodec.CACHE_SIZE + 10):
+            urncodec.decode('urn:publicid:IDN+eict.de+user+u%d' % (i,))
+        self.assertEqual(len(urncodec._decode_cache), urncodec.CACHE_SIZE)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0, exit=True)
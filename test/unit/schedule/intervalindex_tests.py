@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+import unittest
+import random
+import os.path
+import sys
+from datetime import datetime, timedelta
+
+# the interval index has no dependencies, so it can be imported without starting the server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src', 'vendor', 'schedule'))
+
+from intervalindex import IntervalIndex
+
+RUNS = 2000
+SEED = 4711
+RESOURCES = ['a', 'b', 'c']
+BASE = datetime(2014, 1, 1)
+
+def reference_touching(reservations, resource_id, start_time, end_time):
+    """The predicate used in Schedule.find: not (end_time < start or start_time > end)."""
+    return sorted(i for i, (r, s, e) in reservations.iteritems() if r == resource_id and not (e < start_time or s > end_time))
+
+class TestIntervalIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.rnd = random.Random(SEED)
+
+    def random_period(self, max_hours):
+        start = BASE + timedelta(hours=self.rnd.randint(0, 1000))
+        return start, start + timedelta(hours=self.rnd.randint(0, max_hours))
+
+    def test_equals_reference(self):
+        index = IntervalIndex(BASE)
+        reservations = {}
+        for i in range(500):
+            resource_id = self.rnd.choice(RESOURCES)
+            start, end = self.random_period(50)
+            index.add(i, resource_id, start, end)
+            reservations[i] = (resource_id, start, end)
+        for i in self.rnd.sample(range(500), 100):
+            index.remove(i)
+            del reservations[i]
+        for i in self.rnd.sample(reservations.keys(), 50): # re-add with other times (see Schedule.update)
+            start, end = self.random_period(50)
+            index.add(i, reservations[i][0], start, end)
+            reservations[i] = (reservations[i][0], start, end)
+        for _ in range(RUNS):
+            resource_id = self.rnd.choice(RESOURCES)
+            start, end = self.random_period(30)
+            self.assertEqual(sorted(index.touching(resource_id, start, end)), reference_touching(reservations, resource_id, start, end))
+
+    def test_prune(self):
+        index = IntervalIndex(BASE)
+        index.add(1, 'a', BASE, BASE + timedelta(hours=1))
+        index.add(2, 'a', BASE + timedelta(hours=2), BASE + timedelta(hours=3))
+        index.prune(BASE + timedelta(hours=2))
+        self.assertEqual(index.touching('a', BASE, BASE + timedelta(hours=5)), [2])
+        self.assertFalse(index.covers(BASE - timedelta(hours=1)))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0, exit=True)
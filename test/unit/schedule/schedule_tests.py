@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Tests the pruning of the Schedule (with a temporary SQLite database).
+"""
+import unittest
+import os.path
+import sys
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+# the pluginmanager needs deploy/config.json (see amsoil.config), the schedule's config items are given by the Config below
+SRC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src')
+sys.path.insert(0, SRC_PATH)
+sys.path.insert(0, os.path.join(SRC_PATH, 'vendor', 'schedule'))
+
+import amsoil.core.pluginmanager as pm
+
+TEMP_PATH = tempfile.mkdtemp()
+
+class Config(object):
+    ITEMS = {'schedule.dbpath' : os.path.join(TEMP_PATH, 'schedule.db'), 'schedule.keep_expired' : 0, 'schedule.archive_expired' : True, 'schedule.interval_index' : False}
+    def get(self, key):
+        return self.ITEMS[key]
+
+pm.registerService('config', Config())
+import schedulep
+
+class TestPrune(unittest.TestCase):
+
+    def setUp(self):
+        self.schedule = schedulep.Schedule('tests', 60)
+        self.past = datetime.utcnow() - timedelta(0, 3600)
+        for record_class in [schedulep.ReservationRecord, schedulep.ArchivedReservationRecord]:
+            schedulep.db_session.query(record_class).delete()
+        schedulep.db_session.commit()
+
+    def archived_ids(self):
+        return [row[0] for row in schedulep.db_session.query(schedulep.ArchivedReservationRecord.reservation_id)]
+
+    def reserve_expired(self):
+        return self.schedule.reserve('resource', start_time=self.past, end_time=self.past + timedelta(0, 60)).reservation_id
+
+    def test_prune_reused_id(self):
+        first = self.reserve_expired()
+        self.assertEqual(self.schedule.prune(), 1)
+        second = self.reserve_expired()
+        self.assertEqual(second, first) # SQLite reuses the id of the pruned reservation
+        self.assertEqual(self.schedule.prune(), 1)
+        self.assertEqual(self.archived_ids(), [first, second])
+        self.assertEqual(self.schedule.find(), [])
+
+    def test_prune_keeps_current(self):
+        expired = self.reserve_expired()
+        current = self.schedule.reserve('resource').reservation_id
+        self.assertEqual(self.schedule.prune(), 1)
+        self.assertEqual([r.reservation_id for r in self.schedule.find()], [current])
+        self.assertIn(expired, self.archived_ids())
+
+if __name__ == '__main__':
+    try:
+        program = unittest.main(verbosity=0, exit=False)
+    finally:
+        shutil.rmtree(TEMP_PATH)
+    sys.exit(not program.result.wasSuccessful())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Tests the job stores of the worker (workerdb with SQLite and, if a MongoDB server is running on localhost, workermongo).
+"""
+import unittest
+import os.path
+import sys
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+# the pluginmanager needs deploy/config.json (see amsoil.config), the store's config items are given by the Config below
+SRC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src')
+sys.path.insert(0, SRC_PATH)
+sys.path.insert(0, os.path.join(SRC_PATH, 'vendor', 'worker'))
+sys.path.insert(0, os.path.join(SRC_PATH, 'plugins', 'mongodb'))
+
+import amsoil.core.pluginmanager as pm
+
+TEMP_PATH = tempfile.mkdtemp()
+COMMIT_INTERVAL = 0.2
+
+class Config(object):
+    ITEMS = {'worker.dbpath' : os.path.join(TEMP_PATH, 'worker.db'), 'worker.commit_interval' : COMMIT_INTERVAL}
+    def get(self, key):
+        return self.ITEMS[key]
+
+pm.registerService('config', Config())
+import workerdb
+
+MONGO_DATABASE = 'ohouse_worker_tests'
+try:
+    import pymongo
+    pymongo.MongoClient('localhost', 27017, connectTimeoutMS=500).server_info()
+    from mongodatabase import MongoDB
+    pm.registerService('mongodb', lambda: MongoDB('localhost', 27017, MONGO_DATABASE), lazy=True)
+    import workermongo
+except Exception: # pymongo not installed or no server running
+    workermongo = None
+
+OWNER, OTHER = 'tests:1', 'tests:2'
+
+class StoreTests(object):
+    """Tests which apply to all stores ({store} is the store's module)."""
+    store = None
+
+    def setUp(self):
+        for entry in self.store.getAllJobs():
+            self.store.delJob(entry)
+        self.now = datetime.now()
+
+    def add(self, name='job', recurring_interval=None, next_execution=None, params=None):
+        stored = []
+        entry = self.store.JobDBEntry(service_name='service', callable_attr_str=name, params=params, recurring_interval=recurring_interval, next_execution=next_execution)
+        self.store.addJob(entry, lambda: stored.append(True))
+        self.store.flush()
+        self.store.expire()
+        self.assertEqual(stored, [True])
+        return [e for e in self.store.getAllJobs() if e.callable_attr_str == name][0].id
+
+    def due_ids(self, exclude_ids=()):
+        return [job_id for _, job_id in self.store.getDueJobIds(self.now, 10, exclude_ids)]
+
+    def test_add_and_due(self):
+        soon = self.add('soon', params={'a' : [1, 2]})
+        scheduled = self.add('scheduled', next_execution=self.now - timedelta(0, 10))
+        later = self.add('later', next_execution=self.now + timedelta(0, 60))
+        self.assertEqual(self.due_ids(), [soon, scheduled]) # jobs without next_execution first
+        self.assertEqual(self.due_ids([soon]), [scheduled])
+        self.assertEqual(self.store.getJob(soon).params, {'a' : [1, 2]})
+        self.assertEqual(self.store.getNextExecution([scheduled]), self.now + timedelta(0, 60))
+
+    def test_recurring_job_replaces_older_one(self):
+        self.add('recurring', recurring_interval=60)
+        newer = self.add('recurring', recurring_interval=30)
+        self.assertEqual([e.id for e in self.store.getAllJobs()], [newer])
+
+    def test_claim(self):
+        job_id = self.add()
+        self.assertTrue(self.store.claimJob(job_id, OWNER, self.now + timedelta(0, 60), self.now))
+        self.assertFalse(self.store.claimJob(job_id, OTHER, self.now + timedelta(0, 60), self.now))
+        self.assertEqual(self.due_ids(), []) # leased
+        self.assertTrue(self.store.claimJob(job_id, OTHER, self.now + timedelta(0, 120), self.now + timedelta(0, 61))) # lease expired
+
+    def test_claim_not_due(self):
+        job_id = self.add(next_execution=self.now + timedelta(0, 60))
+        self.assertFalse(self.store.claimJob(job_id, OWNER, self.now + timedelta(0, 60), self.now))
+
+    def test_renew(self):
+        job_id = self.add()
+        self.store.claimJob(job_id, OWNER, self.now + timedelta(0, 10), self.now)
+        self.store.renewLeases([job_id], OTHER, self.now + timedelta(0, 100)) # not the owner
+        self.store.renewLeases([job_id], OWNER, self.now + timedelta(0, 60))
+        self.store.expire()
+        self.assertFalse(self.store.claimJob(job_id, OTHER, self.now + timedelta(0, 120), self.now + timedelta(0, 30)))
+        self.assertTrue(self.store.claimJob(job_id, OTHER, self.now + timedelta(0, 120), self.now + timedelta(0, 61)))
+
+    def test_finish(self):
+        job_id = self.add()
+        self.store.claimJob(job_id, OWNER, self.now + timedelta(0, 60), self.now)
+        self.assertFalse(self.store.finishJob(job_id, OTHER))
+        self.assertTrue(self.store.finishJob(job_id, OWNER))
+        self.store.expire()
+        self.assertEqual(self.store.getJob(job_id), None)
+
+    def test_finish_recurring(self):
+        job_id = self.add(recurring_interval=60)
+        self.store.claimJob(job_id, OWNER, self.now + timedelta(0, 60), self.now)
+        self.assertTrue(self.store.finishJob(job_id, OWNER, self.now + timedelta(0, 60)))
+        self.store.expire()
+        self.assertEqual(self.due_ids(), []) # not due before the next execution
+        self.assertEqual(self.store.getNextExecution(), self.now + timedelta(0, 60))
+        self.assertTrue(self.store.claimJob(job_id, OTHER, self.now + timedelta(0, 120), self.now + timedelta(0, 60))) # lease released
+
+class TestSQLiteStore(StoreTests, unittest.TestCase):
+    store = workerdb
+
+    def test_add_is_committed_in_the_background(self):
+        stored = []
+        workerdb.addJob(workerdb.JobDBEntry(service_name='service', callable_attr_str='async'), lambda: stored.append(True))
+        self.assertEqual(stored, []) # addJob returns before the job is committed
+        workerdb.flush()
+        workerdb.expire()
+        self.assertEqual(stored, [True])
+        self.assertEqual(len(self.due_ids()), 1)
+
+@unittest.skipIf(workermongo is None, "pymongo is not installed or no MongoDB server is running on localhost")
+class TestMongoStore(StoreTests, unittest.TestCase):
+    store = workermongo
+
+    @classmethod
+    def tearDownClass(klass):
+        pymongo.MongoClient('localhost', 27017).drop_database(MONGO_DATABASE)
+
+if __name__ == '__main__':
+    try:
+        program = unittest.main(verbosity=0, exit=False)
+    finally:
+        shutil.rmtree(TEMP_PATH)
+    sys.exit(not program.result.wasSuccessful())
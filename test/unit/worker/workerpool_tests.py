@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+import unittest
+import os.path
+import sys
+import os
+import threading
+import time
+import Queue
+
+# the pluginmanager needs deploy/config.json (see amsoil.config), but no plugins are loaded
+SRC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src')
+sys.path.insert(0, SRC_PATH)
+sys.path.insert(0, os.path.join(SRC_PATH, 'vendor', 'worker'))
+
+import amsoil.core.pluginmanager as pm
+import workerpool
+
+class TestJobs(object):
+    """Service whose jobs block until released (see release)."""
+    def __init__(self):
+        self.events = {}
+        self.calls = []
+
+    def block(self, params):
+        self.calls.append(params)
+        self.events.setdefault(params, threading.Event()).wait(5)
+    block._outsideprocess = True
+
+    def fail(self, params):
+        raise ValueError("failed")
+    fail._outsideprocess = True
+
+    def exit(self, params):
+        os._exit(1) # as if the process was killed
+    exit._outsideprocess = True
+
+    def not_marked(self, params):
+        pass
+
+    def release(self, params):
+        self.events.setdefault(params, threading.Event()).set()
+
+JOBS = TestJobs()
+pm.registerService('workerpooltestjobs', JOBS)
+
+class JobRecord(object):
+    def __init__(self, id, callable_attr_str='block', params=None, service_name='workerpooltestjobs'):
+        self.id, self.service_name, self.callable_attr_str, self.params, self.recurring_interval = id, service_name, callable_attr_str, params, None
+
+class TestJobPool(unittest.TestCase):
+
+    def setUp(self):
+        self.finished = Queue.Queue()
+
+    def pool(self, size=2, limits=None):
+        return workerpool.JobPool(size, 'thread', limits, self.finished.put)
+
+    def wait_finished(self):
+        return self.finished.get(timeout=5)
+
+    def test_runs_job_and_keeps_id_until_released(self):
+        pool = self.pool()
+        pool.submit(workerpool.Job(JobRecord(1, params='a'), time.time()))
+        self.assertEqual(pool.running_ids(), set([1]))
+        JOBS.release('a')
+        job = self.wait_finished()
+        self.assertTrue(job.success)
+        self.assertEqual(pool.running_ids(), set([1])) # finished, but not handled by the caller yet
+        self.assertFalse(pool.is_running(1))
+        pool.release(1)
+        self.assertEqual(pool.running_ids(), set())
+
+    def test_pool_and_service_limits(self):
+        pool = self.pool(size=2, limits={'workerpooltestjobs' : 1})
+        self.assertTrue(pool.can_submit('workerpooltestjobs'))
+        pool.submit(workerpool.Job(JobRecord(1, params='b'), time.time()))
+        self.assertFalse(pool.can_submit('workerpooltestjobs')) # service limit
+        self.assertTrue(pool.can_submit('other'))
+        pool.submit(workerpool.Job(JobRecord(2, params='c', service_name='workerpooltestjobs'), time.time())) # not checked by submit
+        self.assertFalse(pool.can_submit('other')) # pool size
+        JOBS.release('b'), JOBS.release('c')
+        self.wait_finished(), self.wait_finished()
+        self.assertTrue(pool.can_submit('workerpooltestjobs')) # finished jobs do not count, even if not released
+
+    def test_failing_jobs(self):
+        pool = self.pool()
+        for job_id, attr in [(3, 'fail'), (4, 'not_marked'), (5, 'missing')]:
+            pool.submit(workerpool.Job(JobRecord(job_id, attr), time.time()))
+            self.assertFalse(self.wait_finished().success)
+        self.assertEqual(pool.stats.snapshot()[('workerpooltestjobs', 'fail')]['errors'], 1)
+
+    def test_lost_process(self):
+        pool = workerpool.JobPool(1, 'process', None, self.finished.put)
+        pool.submit(workerpool.Job(JobRecord(6, 'exit'), time.time()))
+        deadline = time.time() + 5
+        while pool.running_ids() and (time.time() < deadline):
+            time.sleep(0.05)
+            pool.check_lost()
+        self.assertEqual(pool.running_ids(), set()) # not reported as finished, so the lease expires
+        self.assertTrue(self.finished.empty())
+        self.assertEqual(pool.stats.snapshot()[('workerpooltestjobs', 'exit')]['errors'], 1)
+        self.assertTrue(pool.can_submit('workerpooltestjobs'))
+        pool.submit(workerpool.Job(JobRecord(7, 'not_marked'), time.time())) # the pool has replaced the process
+        self.assertFalse(self.wait_finished().success)
+        pool.check_lost()
+        self.assertEqual(pool.running_ids(), set([7]))
+
+    def test_unknown_pool_type(self):
+        self.assertRaises(ValueError, workerpool.JobPool, 1, 'fiber', None, None)
+
+class TestJobStats(unittest.TestCase):
+
+    def job(self, attr, due, started, run_time, success=True):
+        job = workerpool.Job(JobRecord(1, attr), due)
+        job.started, job.run_time, job.success = started, run_time, success
+        return job
+
+    def test_record(self):
+        stats = workerpool.JobStats()
+        stats.record(self.job('a', 10.0, 12.0, 1.0))
+        stats.record(self.job('a', 10.0, 11.0, 3.0, success=False))
+        stats.record(self.job('b', 10.0, 9.0, 0.5)) # started before due: no negative wait
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot[('workerpooltestjobs', 'a')], {'count' : 2, 'errors' : 1, 'wait_total' : 3.0, 'wait_max' : 2.0, 'run_total' : 4.0, 'run_max' : 3.0})
+        self.assertEqual(snapshot[('workerpooltestjobs', 'b')]['wait_total'], 0)
+        snapshot[('workerpooltestjobs', 'a')]['count'] = 100 # a copy
+        self.assertEqual(stats.snapshot()[('workerpooltestjobs', 'a')]['count'], 2)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0, exit=True)